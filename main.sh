@@ -1,2 +1,4 @@
-python3 src/main.py
-cd public && python3 -m http.server 8888
\ No newline at end of file
+python3 src/main.py --watch &
+WATCH_PID=$!
+trap 'kill $WATCH_PID' EXIT
+python3 -m http.server 8888 --directory docs
@@ -0,0 +1,62 @@
+import json
+import os
+from fileindex import FileIndex, relative_path
+from manifest import hash_bytes
+
+ASSET_MANIFEST_NAME = "assets.json"
+FINGERPRINT_LENGTH = 8
+
+def fingerprint_name(name, digest):
+    stem, ext = os.path.splitext(name)
+    return f"{stem}.{digest[:FINGERPRINT_LENGTH]}{ext}"
+
+class AssetManifest:
+    # Maps every static file's site URL to its content-hashed URL. Pages and
+    # templates are rendered against one of these, so it is hashable by
+    # content and cheap to use as part of a cache key.
+    def __init__(self, urls, sources=None):
+        self.urls = urls
+        self.sources = sources or {}
+        self.digest = hash_bytes(json.dumps(urls, sort_keys=True).encode())
+
+    @classmethod
+    def from_dir(cls, source_dir, files=None):
+        if files is None:
+            files = FileIndex.scan([source_dir])
+
+        urls = {}
+        sources = {}
+        for entry in files.files(source_dir):
+            source_path = entry.path
+            rel_dir, name = os.path.split(relative_path(source_dir, source_path).replace(os.sep, "/"))
+            prefix = "/" if not rel_dir else f"/{rel_dir}/"
+            sources[source_path] = fingerprint_name(name, files.hash(source_path))
+            urls[prefix + name] = prefix + sources[source_path]
+        return cls(urls, sources)
+
+    def resolve(self, url):
+        return self.urls.get(url, url)
+
+    def dest_names(self, source_path):
+        # Every file is also copied under its own name: some URLs must not
+        # change (robots.txt, favicon.ico, CNAME), and references the rewriter
+        # never sees, like CSS url() or relative paths, still use that name.
+        name = os.path.basename(source_path)
+        if source_path not in self.sources:
+            return [name]
+        return [name, self.sources[source_path]]
+
+    def save(self, dest_dir):
+        path = os.path.join(dest_dir, ASSET_MANIFEST_NAME)
+        with open(path, 'w') as f:
+            json.dump(self.urls, f, indent=2, sort_keys=True)
+        return path
+
+    def __hash__(self):
+        return hash(self.digest)
+
+    def __eq__(self, other):
+        return isinstance(other, AssetManifest) and self.digest == other.digest
+
+    def __repr__(self):
+        return f"AssetManifest(assets: {len(self.urls)}, digest: {self.digest[:FINGERPRINT_LENGTH]})"
@@ -0,0 +1,125 @@
+import argparse
+import io
+import json
+import os
+import platform
+import statistics
+import tempfile
+import time
+from contextlib import redirect_stdout
+
+from corpus import SCENARIOS, generate_corpus
+from htmlnode import markdown_to_html_node
+from main import BuildOptions, copy_static, find_pages, generate_pages_recursive
+from manifest import GENERATOR_VERSION
+from page import extract_title
+from template import load_template
+
+def summarize(samples):
+    return {
+        "min": min(samples),
+        "median": statistics.median(samples),
+        "max": max(samples),
+    }
+
+def time_stages(pages, template):
+    # Times each stage of the page pipeline on its own, summed over all pages.
+    totals = {"read": 0.0, "parse": 0.0, "render": 0.0, "write": 0.0}
+    output_bytes = 0
+
+    for from_path, dest_path in pages:
+        start = time.perf_counter()
+        with open(from_path, 'r') as f:
+            markdown = f.read()
+        read = time.perf_counter()
+        htmlnode = markdown_to_html_node(markdown)
+        parsed = time.perf_counter()
+        html = template.render({"Title": extract_title(markdown), "Content": htmlnode.to_html()})
+        rendered = time.perf_counter()
+        os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+        with open(dest_path, 'w') as f:
+            f.write(html)
+        written = time.perf_counter()
+
+        totals["read"] += read - start
+        totals["parse"] += parsed - read
+        totals["render"] += rendered - parsed
+        totals["write"] += written - rendered
+        output_bytes += len(html)
+
+    return totals, output_bytes
+
+def run_scenario(params, repeat=3, jobs=1):
+    samples = {}
+    with tempfile.TemporaryDirectory() as root:
+        corpus = generate_corpus(root, **params)
+        content_dir = os.path.join(root, "content")
+        static_dir = os.path.join(root, "static")
+        template_path = os.path.join(root, "template.html")
+        dest_dir = os.path.join(root, "docs")
+        stage_dir = os.path.join(root, "stages")
+
+        for _ in range(repeat):
+            with redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                copy_static(static_dir, dest_dir)
+                copied = time.perf_counter()
+                generate_pages_recursive(content_dir, template_path, dest_dir, "/", BuildOptions(jobs=jobs))
+                done = time.perf_counter()
+
+            samples.setdefault("copy_static", []).append(copied - start)
+            samples.setdefault("generate_pages_recursive", []).append(done - copied)
+
+            template = load_template(template_path, "/")
+            totals, output_bytes = time_stages(find_pages(content_dir, stage_dir), template)
+            for stage, seconds in totals.items():
+                samples.setdefault(stage, []).append(seconds)
+
+    return {
+        "params": params,
+        "markdown_bytes": corpus["markdown_bytes"],
+        "output_bytes": output_bytes,
+        "pages": corpus["pages"],
+        "stages": {stage: summarize(values) for stage, values in samples.items()},
+    }
+
+def run(names, repeat=3, jobs=1):
+    results = {
+        "generator_version": GENERATOR_VERSION,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "jobs": jobs,
+        "repeat": repeat,
+        "scenarios": {},
+    }
+
+    for name in names:
+        result = run_scenario(SCENARIOS[name], repeat, jobs)
+        results["scenarios"][name] = result
+        stages = ", ".join(f"{stage} {timing['median'] * 1000:.1f} ms"
+                           for stage, timing in result["stages"].items())
+        print(f"{name}: {result['pages']} pages, {stages}")
+
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time full builds of synthetic corpora.")
+    parser.add_argument("scenarios", nargs="*", default=sorted(SCENARIOS),
+                        help=f"scenarios to run (default: all of {', '.join(sorted(SCENARIOS))})")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--jobs", "-j", type=int, default=1)
+    parser.add_argument("--output", "-o", default="bench_output.json",
+                        help="where to save the JSON results")
+    args = parser.parse_args(argv)
+
+    unknown = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)}")
+
+    results = run(args.scenarios, args.repeat, args.jobs)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+    print(f"Saved results to {args.output}")
+
+if __name__ == "__main__":
+    main()
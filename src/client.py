@@ -0,0 +1,50 @@
+import json
+import os
+import socket
+import sys
+
+# Only the standard library is imported here: the client has to start fast, and
+# everything heavy already lives in the daemon.
+
+DAEMON_SOCKET = os.path.join(".build-cache", "daemon.sock")
+
+def send_request(request, socket_path=DAEMON_SOCKET):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path)
+        sock.sendall(json.dumps(request).encode() + b"\n")
+        sock.shutdown(socket.SHUT_WR)
+        chunks = []
+        while True:
+            chunk = sock.recv(1 << 16)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    return json.loads(b"".join(chunks))
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] not in ("build", "render", "stop") or (argv[0] == "render") != (len(argv) == 2):
+        print("usage: client.py build | render PATH | stop", file=sys.stderr)
+        return 2
+
+    request = {"command": argv[0]}
+    if argv[0] == "render":
+        request["path"] = argv[1]
+
+    try:
+        response = send_request(request)
+    except OSError as e:
+        print(f"Cannot reach the build daemon at {DAEMON_SOCKET}: {e}", file=sys.stderr)
+        return 1
+
+    if response.get("log"):
+        print(response["log"], end="")
+    if not response["ok"]:
+        print(f"Error: {response['error']}", file=sys.stderr)
+        return 1
+    if "html" in response:
+        print(response["html"])
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+import gzip
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from manifest import hash_bytes
+
+GZIP_CACHE_DIR = os.path.join(".build-cache", "gzip")
+COMPRESSIBLE_EXTENSIONS = {".html", ".css", ".js", ".json", ".svg", ".txt", ".xml"}
+MIN_SIZE = 1024
+# Blobs beyond this many bytes are evicted, least recently used first.
+GZIP_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+def is_compressible(path, min_size=MIN_SIZE):
+    if os.path.splitext(path)[1].lower() not in COMPRESSIBLE_EXTENSIONS:
+        return False
+    return os.path.getsize(path) >= min_size
+
+def find_compressible(dir_path, min_size=MIN_SIZE):
+    paths = []
+    for root, dirs, files in os.walk(dir_path):
+        dirs.sort()
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            if is_compressible(path, min_size):
+                paths.append(path)
+    return paths
+
+def write_if_changed(path, data):
+    try:
+        with open(path, 'rb') as f:
+            if f.read() == data:
+                return False
+    except FileNotFoundError:
+        pass
+
+    # Two files with the same content share a cache entry, so the temporary
+    # name must not collide between threads, or between shards built at once.
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return True
+
+def compress_file(path, cache_dir=GZIP_CACHE_DIR):
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    # Compressed bodies are kept by content hash, so a page that is
+    # regenerated with the same HTML is never compressed twice.
+    blob_path = os.path.join(cache_dir, hash_bytes(data) + ".gz")
+    try:
+        with open(blob_path, 'rb') as f:
+            compressed = f.read()
+    except FileNotFoundError:
+        # mtime=0 keeps the output identical from build to build.
+        compressed = gzip.compress(data, compresslevel=9, mtime=0)
+        status = "compressed"
+        try:
+            write_if_changed(blob_path, compressed)
+        except FileNotFoundError:
+            # The cache is shared with other builds, which may have removed
+            # the cache directory in the meantime. The blob is only a cache.
+            pass
+    else:
+        status = "reused"
+        # The mtime doubles as the last-used time for LRU eviction.
+        try:
+            os.utime(blob_path)
+        except OSError:
+            pass
+
+    if not write_if_changed(path + ".gz", compressed) and status == "reused":
+        status = "unchanged"
+    return path + ".gz", blob_path, status
+
+def prune_cache(cache_dir, max_bytes=GZIP_CACHE_MAX_BYTES):
+    # Evicts by size only, never by what this build used: shards and other
+    # builds sharing the cache may be using the rest.
+    entries = []
+    total = 0
+    for name in os.listdir(cache_dir):
+        if not name.endswith(".gz"):
+            continue
+        blob_path = os.path.join(cache_dir, name)
+        try:
+            stat = os.stat(blob_path)
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_mtime_ns, stat.st_size, blob_path))
+        total += stat.st_size
+
+    removed = 0
+    for mtime, size, blob_path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(blob_path)
+        except FileNotFoundError:
+            pass
+        total -= size
+        removed += 1
+    return removed
+
+def precompress(paths, jobs=1, cache_dir=GZIP_CACHE_DIR, max_bytes=GZIP_CACHE_MAX_BYTES):
+    os.makedirs(cache_dir, exist_ok=True)
+
+    # zlib releases the GIL while it compresses, so threads are enough here.
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        results = list(pool.map(compress_file, paths, [cache_dir] * len(paths)))
+
+    counts = {"compressed": 0, "reused": 0, "unchanged": 0}
+    for gz_path, blob_path, status in results:
+        counts[status] += 1
+    prune_cache(cache_dir, max_bytes)
+
+    print(f"Precompressed {len(results)} files: {counts['compressed']} compressed, "
+          f"{counts['reused']} reused, {counts['unchanged']} unchanged")
+    return [gz_path for gz_path, blob_path, status in results]
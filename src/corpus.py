@@ -0,0 +1,135 @@
+import os
+import random
+
+WORDS = (
+    "the road goes ever on and on down from the door where it began now far "
+    "ahead has gone and I must follow if I can pursuing it with eager feet "
+    "until it joins some larger way where many paths and errands meet"
+).split()
+
+DEFAULT_BLOCK_MIX = {
+    "paragraph": 6,
+    "heading": 2,
+    "code": 1,
+    "quote": 1,
+    "unordered_list": 1,
+    "ordered_list": 1,
+}
+
+TEMPLATE = """<!doctype html>
+<html>
+  <head>
+    <meta charset="utf-8" />
+    <title>{{ Title }}</title>
+    <link href="/index.css" rel="stylesheet" />
+  </head>
+
+  <body>
+    <article>{{ Content }}</article>
+  </body>
+</html>"""
+
+# Named corpora for the benchmark runner. Every parameter not given here takes
+# the default of generate_corpus.
+SCENARIOS = {
+    "small": {"pages": 50},
+    "large-pages": {"pages": 20, "blocks": 400},
+    "many-pages": {"pages": 2000, "blocks": 10},
+    "inline-heavy": {"pages": 100, "inline_density": 0.6, "links": 8, "images": 4},
+    "deep-tree": {"pages": 500, "depth": 6},
+    "code-heavy": {"pages": 100, "block_mix": {"code": 4, "paragraph": 1}},
+}
+
+class CorpusWriter:
+    def __init__(self, seed, inline_density, links, images, line_words):
+        self.rng = random.Random(seed)
+        self.inline_density = inline_density
+        self.links = links
+        self.images = images
+        self.line_words = line_words
+
+    def words(self, count):
+        return [self.rng.choice(WORDS) for _ in range(count)]
+
+    def inline_text(self, count):
+        words = self.words(count)
+        for i, word in enumerate(words):
+            if self.rng.random() < self.inline_density:
+                delimiter = self.rng.choice(("**", "_", "`"))
+                words[i] = f"{delimiter}{word}{delimiter}"
+
+        for _ in range(self.links):
+            target = "/".join(self.words(2))
+            words.insert(self.rng.randrange(len(words) + 1), f"[{self.rng.choice(WORDS)}](/{target})")
+
+        for _ in range(self.images):
+            name = self.rng.choice(WORDS)
+            words.insert(self.rng.randrange(len(words) + 1), f"![{name}](/images/{name}.png)")
+
+        return " ".join(words)
+
+    def block(self, block_type):
+        if block_type == "heading":
+            level = self.rng.randint(2, 6)
+            return "#" * level + " " + " ".join(self.words(4))
+
+        if block_type == "code":
+            lines = [" ".join(self.words(6)) for _ in range(self.rng.randint(2, 8))]
+            return "```\n" + "\n".join(lines) + "\n```"
+
+        if block_type == "quote":
+            lines = [self.inline_text(self.line_words) for _ in range(self.rng.randint(1, 4))]
+            return "\n".join(f"> {line}" for line in lines)
+
+        if block_type == "unordered_list":
+            lines = [self.inline_text(self.line_words // 2) for _ in range(self.rng.randint(2, 6))]
+            return "\n".join(f"- {line}" for line in lines)
+
+        if block_type == "ordered_list":
+            lines = [self.inline_text(self.line_words // 2) for _ in range(self.rng.randint(2, 6))]
+            return "\n".join(f"{i}. {line}" for i, line in enumerate(lines, 1))
+
+        lines = [self.inline_text(self.line_words) for _ in range(self.rng.randint(1, 4))]
+        return "\n".join(lines)
+
+    def page(self, title, blocks, block_mix):
+        kinds = list(block_mix)
+        weights = [block_mix[kind] for kind in kinds]
+        body = [self.block(kind) for kind in self.rng.choices(kinds, weights, k=blocks)]
+        return f"# {title}\n\n" + "\n\n".join(body) + "\n"
+
+def page_dir(index, depth, fanout):
+    parts = []
+    for _ in range(depth):
+        parts.append(f"section{index % fanout}")
+        index //= fanout
+    return os.path.join(*parts) if parts else ""
+
+def generate_corpus(root, pages=100, blocks=20, block_mix=None, inline_density=0.2,
+                    links=2, images=1, depth=2, fanout=4, line_words=16,
+                    static_files=8, static_size=64 * 1024, seed=0):
+    writer = CorpusWriter(seed, inline_density, links, images, line_words)
+    block_mix = block_mix or DEFAULT_BLOCK_MIX
+    content_dir = os.path.join(root, "content")
+    static_dir = os.path.join(root, "static")
+    total_bytes = 0
+
+    for i in range(pages):
+        dir_path = os.path.join(content_dir, page_dir(i, depth, fanout), f"page{i}")
+        os.makedirs(dir_path, exist_ok=True)
+        markdown = writer.page(f"Page {i}", blocks, block_mix)
+        with open(os.path.join(dir_path, "index.md"), 'w') as f:
+            f.write(markdown)
+        total_bytes += len(markdown)
+
+    os.makedirs(os.path.join(static_dir, "images"), exist_ok=True)
+    with open(os.path.join(static_dir, "index.css"), 'w') as f:
+        f.write("body { font-family: serif; }\n")
+    for i in range(static_files):
+        with open(os.path.join(static_dir, "images", f"image{i}.png"), 'wb') as f:
+            f.write(writer.rng.randbytes(static_size))
+
+    with open(os.path.join(root, "template.html"), 'w') as f:
+        f.write(TEMPLATE)
+
+    return {"pages": pages, "markdown_bytes": total_bytes}
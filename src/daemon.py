@@ -0,0 +1,119 @@
+import io
+import json
+import os
+import socket
+import socketserver
+import time
+from contextlib import redirect_stdout
+from client import DAEMON_SOCKET
+from page import render_page
+
+class BuildDaemon:
+    # Serves build and render requests from one Watcher, which keeps the
+    # compiled template, every page's rendered values and the stamps of the
+    # content, static and template files in memory between requests.
+    def __init__(self, watcher, socket_path=DAEMON_SOCKET):
+        self.watcher = watcher
+        self.socket_path = socket_path
+        self.built = False
+        self.server = None
+
+    def refresh(self):
+        # The first request does a full build; later ones only redo what
+        # changed since the last request. The Watcher only records a source as
+        # seen once it has been handled, so a request that fails part way
+        # leaves the rest for the next one.
+        if not self.built:
+            outputs = self.watcher.build()
+            self.built = True
+            return outputs
+        return self.watcher.poll()
+
+    def build(self, request):
+        return {"outputs": self.refresh()}
+
+    def source_path(self, path):
+        # Only pages under the content directory can be rendered; the path is
+        # resolved first so neither .. nor a symlink can point outside it.
+        content_dir = os.path.realpath(self.watcher.content_dir)
+        real_path = os.path.realpath(path)
+        if os.path.commonpath([real_path, content_dir]) != content_dir:
+            raise ValueError(f"{path} is not under {self.watcher.content_dir}")
+        return os.path.join(self.watcher.content_dir, os.path.relpath(real_path, content_dir))
+
+    def render(self, request):
+        self.refresh()
+        source_path = self.source_path(request["path"])
+        values = self.watcher.rendered.get(source_path)
+        if values is None:
+            with open(source_path, 'r') as f:
+                values = render_page(f.read(), self.watcher.template)
+        return {"html": self.watcher.template.render(values)}
+
+    def stop(self, request):
+        self.server.stopping = True
+        return {}
+
+    def handle(self, request):
+        commands = {"build": self.build, "render": self.render, "stop": self.stop}
+        start = time.perf_counter()
+        log = io.StringIO()
+        try:
+            with redirect_stdout(log):
+                command = commands.get(request.get("command"))
+                if command is None:
+                    raise ValueError(f"unknown command: {request.get('command')!r}")
+                response = command(request)
+        except Exception as e:
+            response = {"ok": False, "error": str(e)}
+        else:
+            response["ok"] = True
+
+        response["log"] = log.getvalue()
+        response["ms"] = (time.perf_counter() - start) * 1000
+        return response
+
+    def serve(self):
+        if os.path.exists(self.socket_path):
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                try:
+                    sock.connect(self.socket_path)
+                except OSError:
+                    os.remove(self.socket_path)
+                else:
+                    raise SystemExit(f"A build daemon is already listening on {self.socket_path}")
+
+        socket_dir = os.path.dirname(self.socket_path)
+        if socket_dir:
+            os.makedirs(socket_dir, exist_ok=True)
+
+        daemon = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                line = self.rfile.readline()
+                if not line:
+                    # A connection that sends nothing, like another daemon
+                    # checking whether this one is alive, gets no reply.
+                    return
+                try:
+                    request = json.loads(line)
+                except ValueError as e:
+                    response = {"ok": False, "error": f"bad request: {e}"}
+                else:
+                    response = daemon.handle(request)
+                self.wfile.write(json.dumps(response).encode() + b"\n")
+
+        # One request at a time: the Watcher's state is not shared between threads.
+        with socketserver.UnixStreamServer(self.socket_path, Handler) as server:
+            self.server = server
+            server.stopping = False
+            print(f"Build daemon listening on {self.socket_path}")
+            try:
+                while not server.stopping:
+                    server.handle_request()
+            except KeyboardInterrupt:
+                pass
+            finally:
+                os.remove(self.socket_path)
+        print("Build daemon stopped")
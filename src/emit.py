@@ -0,0 +1,85 @@
+from htmlnode import URL_PROPS, check_heading_level, rebase_url
+from textnode import BlockType, TextType, block_text, scan_blocks, tokenize_inline
+
+# Renders Markdown straight to an HTML string, with no TextNode or HTMLNode
+# in between. The output must stay byte-identical to
+# markdown_to_html_node(markdown).to_html(...), which remains the path for
+# anything that needs the tree.
+
+INLINE_TAGS = {
+    TextType.BOLD: "b",
+    TextType.ITALIC: "i",
+    TextType.CODE: "code",
+}
+
+def emit_props(props, base_path="/", assets=None):
+    parts = []
+    for key in sorted(props):
+        value = props[key]
+        if key in URL_PROPS:
+            value = rebase_url(value, base_path, assets)
+        parts.append(f' {key}="{value}"')
+    return "".join(parts)
+
+def emit_inline(text, base_path="/", assets=None, images=None):
+    parts = []
+    for text_type, value, url in tokenize_inline(text):
+        if text_type == TextType.TEXT:
+            parts.append(value)
+        elif text_type == TextType.LINK:
+            parts.append(f'<a{emit_props({"href": url}, base_path, assets)}>{value}</a>')
+        elif text_type == TextType.IMAGE:
+            props = {"src": url, "alt": value}
+            if images is not None:
+                props = images.image_props(props)
+            parts.append(f"<img{emit_props(props, base_path, assets)}></img>")
+        else:
+            tag = INLINE_TAGS[text_type]
+            parts.append(f"<{tag}>{value}</{tag}>")
+    return "".join(parts)
+
+def emit_items(tag, items, base_path, assets, images):
+    parts = [f"<{tag}>"]
+    for item in items:
+        parts.append(f"<li>{emit_inline(item, base_path, assets, images)}</li>")
+    parts.append(f"</{tag}>")
+    return "".join(parts)
+
+def emit_block(block, block_type, base_path="/", assets=None, images=None):
+    if block_type == BlockType.paragraph:
+        content = block.replace("\n", " ")
+        return f"<p>{emit_inline(content, base_path, assets, images)}</p>"
+
+    if block_type == BlockType.heading:
+        tag = check_heading_level(block)
+        content = block.lstrip("#").lstrip()
+        return f"<{tag}>{emit_inline(content, base_path, assets, images)}</{tag}>"
+
+    if block_type == BlockType.code:
+        lines = block.split("\n")
+        return "<pre><code>" + "\n".join(lines[1:-1]) + "\n</code></pre>"
+
+    if block_type == BlockType.quote:
+        content = " ".join(line.lstrip(">").lstrip() for line in block.split("\n"))
+        return f"<blockquote>{emit_inline(content, base_path, assets, images)}</blockquote>"
+
+    if block_type == BlockType.unordered_list:
+        items = (line.lstrip("- ").lstrip("* ").strip() for line in block.split("\n"))
+        return emit_items("ul", [item for item in items if item], base_path, assets, images)
+
+    if block_type == BlockType.ordered_list:
+        items = []
+        for line in block.split("\n"):
+            item_parts = line.strip().split(". ", 1)
+            if len(item_parts) == 2 and item_parts[1].strip():
+                items.append(item_parts[1].strip())
+        return emit_items("ol", items, base_path, assets, images)
+
+    raise ValueError(f"unknown block type: {block_type}")
+
+def markdown_to_html(markdown, base_path="/", assets=None, images=None):
+    parts = ["<div>"]
+    for span in scan_blocks(markdown):
+        parts.append(emit_block(block_text(markdown, span), span.block_type, base_path, assets, images))
+    parts.append("</div>")
+    return "".join(parts)
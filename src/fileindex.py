@@ -0,0 +1,100 @@
+import json
+import os
+from collections import namedtuple
+from manifest import hash_file
+
+FILE_INDEX_PATH = os.path.join(".build-cache", "files.json")
+
+FileEntry = namedtuple("FileEntry", ["path", "size", "mtime_ns"])
+
+def scan_files(dir_path, files, dirs):
+    # One scandir per directory. Entry types come with the listing, so only
+    # files cost a stat, and that one stat gives both size and mtime. Entries
+    # are visited depth first in directory order, like a listdir recursion.
+    with os.scandir(dir_path) as entries:
+        for entry in entries:
+            try:
+                if entry.is_file():
+                    stat = entry.stat()
+                    files.append(FileEntry(entry.path, stat.st_size, stat.st_mtime_ns))
+                elif entry.is_dir():
+                    dirs.append(entry.path)
+                    scan_files(entry.path, files, dirs)
+            except FileNotFoundError:
+                # Removed while the tree was being scanned.
+                continue
+    return files, dirs
+
+def relative_path(root, path):
+    # Every indexed path is its root joined with the rest, so slicing is
+    # enough; os.path.relpath would normalise both sides for every file.
+    return path[len(os.path.join(root, "")):]
+
+class FileIndex:
+    # Every file and directory under the source trees, found in one walk, with
+    # the size and mtime each file had. Content hashes from the last build are
+    # kept for files whose size and mtime have not changed, so an unchanged
+    # file is not read again just to hash it.
+    def __init__(self, trees, hashes=None, cache_path=None):
+        self.trees = trees
+        self.entries = {entry.path: entry for files, dirs in trees.values() for entry in files}
+        self.hashes = hashes or {}
+        self.cache_path = cache_path
+
+    @classmethod
+    def scan(cls, roots, cache_path=None):
+        trees = {root: scan_files(root, [], []) for root in roots}
+        index = cls(trees, cache_path=cache_path)
+        if cache_path is None:
+            return index
+
+        try:
+            with open(cache_path, 'r') as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            cache = {}
+        for path, (size, mtime_ns, digest) in cache.get("files", {}).items():
+            entry = index.entries.get(path)
+            if entry is not None and (entry.size, entry.mtime_ns) == (size, mtime_ns):
+                index.hashes[path] = digest
+        return index
+
+    def files(self, root):
+        return self.trees[root][0]
+
+    def dirs(self, root):
+        return self.trees[root][1]
+
+    def size(self, path):
+        entry = self.entries.get(path)
+        if entry is None:
+            return os.path.getsize(path)
+        return entry.size
+
+    def hash(self, path):
+        if path not in self.entries:
+            return hash_file(path)
+        if path not in self.hashes:
+            self.hashes[path] = hash_file(path)
+        return self.hashes[path]
+
+    def save(self):
+        if self.cache_path is None:
+            return
+
+        cache_dir = os.path.dirname(self.cache_path)
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+        files = {}
+        for path, digest in self.hashes.items():
+            entry = self.entries[path]
+            files[path] = [entry.size, entry.mtime_ns, digest]
+
+        tmp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({"files": files}, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.cache_path)
+
+    def __repr__(self):
+        return f"FileIndex(roots: {list(self.trees)}, files: {len(self.entries)})"
@@ -1,49 +1,105 @@
 import re
+import sys
 from enum import Enum
 from textnode import (
-    markdown_to_blocks,
-    block_to_block_type,
+    scan_blocks,
+    block_text,
     text_to_textnodes,
     BlockType,
     TextNode,
     TextType
 )
 
+# Bump whenever markdown_to_html_node can produce a different tree for the same
+# Markdown, so cached trees from older parsers are not reused.
+PARSER_VERSION = "3"
+
+# Props holding a site-relative URL; they are moved under the base path, and
+# to fingerprinted asset names, as they are emitted, so trees themselves never
+# depend on either.
+URL_PROPS = ("href", "src")
+
+def rebase_url(url, base_path="/", assets=None):
+    if not url.startswith("/"):
+        return url
+    if assets is not None:
+        url = assets.resolve(url)
+    if base_path == "/":
+        return url
+    return base_path + url[1:]
+
 class HTMLNode:
+    # Pages hold thousands of these, so no per-instance __dict__, and tag names
+    # are interned so every node with the same tag shares one string.
+    __slots__ = ("tag", "value", "children", "props")
+
     def __init__(self, tag=None, value=None, children=None, props=None):
-        self.tag = tag
+        self.tag = sys.intern(tag) if type(tag) is str else tag
         self.value = value
         self.children = children
         self.props = props
 
-    def to_html(self):
+    def html_parts(self, base_path="/", assets=None, images=None):
         if self.tag is None:
-            return self.value or ""
+            return self.value or "", None, ""
         
+        props = self.props
+        if images is not None and self.tag == "img":
+            props = images.image_props(props or {})
+
         attrs = ""
-        if self.props:
-            for prop, value in self.props.items():
+        if props:
+            for prop, value in props.items():
+                if prop in URL_PROPS:
+                    value = rebase_url(value, base_path, assets)
                 attrs += f' {prop}="{value}"'
         
-        result = f"<{self.tag}{attrs}>"
-        
+        start = f"<{self.tag}{attrs}>"
         if self.value:
-            result += self.value
-        
-        if self.children:
-            for child in self.children:
-                result += child.to_html()
+            start += self.value
         
-        result += f"</{self.tag}>"
-        return result
+        return start, self.children, f"</{self.tag}>"
+
+    def iter_html(self, base_path="/", assets=None, images=None):
+        # Depth-first with an explicit stack: each chunk is produced once and
+        # nothing is concatenated, however deep or wide the tree is.
+        stack = [self]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, str):
+                yield item
+                continue
+
+            start, children, end = item.html_parts(base_path, assets, images)
+            if start:
+                yield start
+            if children:
+                stack.append(end)
+                stack.extend(reversed(children))
+            elif end:
+                yield end
+
+    def write_html(self, f, base_path="/", assets=None, images=None):
+        for chunk in self.iter_html(base_path, assets, images):
+            f.write(chunk)
+
+    def to_html(self, base_path="/", assets=None, images=None):
+        return "".join(self.iter_html(base_path, assets, images))
     
-    def props_to_html(self):
+    def props_to_html(self, base_path="/", assets=None, images=None):
         final_string = ""
-        if self.props == None:
+        props = self.props
+        if images is not None and self.tag == "img":
+            props = images.image_props(props or {})
+
+        if props == None:
             return final_string
         else:
-            for key in sorted(self.props.keys()):
-                final_string += f' {key}="{self.props[key]}"'
+            for key in sorted(props.keys()):
+                value = props[key]
+                if key in URL_PROPS:
+                    value = rebase_url(value, base_path, assets)
+                final_string += f' {key}="{value}"'
 
             return final_string
     
@@ -60,38 +116,36 @@ class HTMLNode:
             return False
         
 class LeafNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, value, props=None):
         super().__init__(tag, value, props)
         self.props = props
         self.children = None
     
-    def to_html(self):
+    def html_parts(self, base_path="/", assets=None, images=None):
         if self.value == None:
             raise ValueError('all leafnodes must have a value')
         
         if self.tag == None:
-            return f"{self.value}"
+            return f"{self.value}", None, ""
         
-        return f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>" 
+        return f"<{self.tag}{self.props_to_html(base_path, assets, images)}>{self.value}</{self.tag}>", None, ""
     
 class ParentNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, children, props=None):
         super().__init__(tag, None, children, props)
 
-    def to_html(self):
+    def html_parts(self, base_path="/", assets=None, images=None):
         if self.tag == None:
             raise ValueError("no tag")
         
         if self.children == None:
             raise ValueError("no children")
         
-        rest_html = ""
-
-        for node in self.children:
-            rest_html += f"{node.to_html()}"
-
-        props_html = self.props_to_html()
-        return f"<{self.tag}{props_html}>{rest_html}</{self.tag}>"
+        return f"<{self.tag}{self.props_to_html(base_path, assets, images)}>", self.children, f"</{self.tag}>"
     
 def text_node_to_html_node(text_node):
     match text_node.text_type:
@@ -232,14 +286,9 @@ def create_blocknode(block, blocktype):
 def markdown_to_html_node(markdown):
     div_node = HTMLNode("div", None, [], None)
 
-    blocks = markdown_to_blocks(markdown)
-    
-    for block in blocks:
-        if not block.strip():
-            continue
-
-        block_type = block_to_block_type(block)
-        block_node = create_blocknode(block, block_type)
+    for span in scan_blocks(markdown):
+        block = block_text(markdown, span)
+        block_node = create_blocknode(block, span.block_type)
         div_node.children.append(block_node)
 
     return div_node
\ No newline at end of file
@@ -0,0 +1,120 @@
+import json
+import os
+import struct
+from fileindex import FileIndex, relative_path
+from manifest import hash_bytes
+
+IMAGE_INDEX_PATH = os.path.join(".build-cache", "images.json")
+IMAGE_EXTENSIONS = {".png", ".gif", ".jpg", ".jpeg"}
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+GIF_SIGNATURES = (b"GIF87a", b"GIF89a")
+# Start-of-frame markers carry the frame size; C4, C8 and CC share the range
+# but are other segments.
+JPEG_SOF_MARKERS = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+def jpeg_size(data):
+    pos = 2
+    while pos + 4 <= len(data):
+        if data[pos] != 0xFF:
+            return None
+        marker = data[pos + 1]
+        if marker == 0xFF:
+            pos += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD8:
+            pos += 2
+            continue
+
+        length = struct.unpack(">H", data[pos + 2:pos + 4])[0]
+        if marker in JPEG_SOF_MARKERS:
+            if pos + 9 > len(data):
+                return None
+            height, width = struct.unpack(">HH", data[pos + 5:pos + 9])
+            return width, height
+        pos += 2 + length
+    return None
+
+def image_size(data):
+    # Only the headers are read; nothing is decoded.
+    if data[:8] == PNG_SIGNATURE and data[12:16] == b"IHDR" and len(data) >= 24:
+        return struct.unpack(">II", data[16:24])
+    if data[:6] in GIF_SIGNATURES and len(data) >= 10:
+        return struct.unpack("<HH", data[6:10])
+    if data[:2] == b"\xff\xd8":
+        return jpeg_size(data)
+    return None
+
+class ImageIndex:
+    # Intrinsic sizes of the images under static/, by site URL. Like an
+    # AssetManifest it is part of what a page is rendered against, so it is
+    # hashable by content.
+    def __init__(self, sizes):
+        self.sizes = sizes
+        self.digest = hash_bytes(json.dumps(sizes, sort_keys=True).encode())
+
+    @classmethod
+    def from_dir(cls, source_dir, cache_path=IMAGE_INDEX_PATH, files=None):
+        if files is None:
+            files = FileIndex.scan([source_dir])
+
+        try:
+            with open(cache_path, 'r') as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            cache = {}
+        cached_files = cache.get("files", {})
+        sizes_by_hash = cache.get("sizes", {})
+
+        # An image is only read again when its size or mtime changes, and only
+        # parsed again when its content hash is new.
+        current_files = {}
+        current_sizes = {}
+        sizes = {}
+        for file_entry in files.files(source_dir):
+            path = file_entry.path
+            if os.path.splitext(path)[1].lower() not in IMAGE_EXTENSIONS:
+                continue
+
+            stamp = [file_entry.size, file_entry.mtime_ns]
+            entry = cached_files.get(path)
+            if entry is None or entry["stamp"] != stamp or entry["hash"] not in sizes_by_hash:
+                with open(path, 'rb') as f:
+                    data = f.read()
+                entry = {"stamp": stamp, "hash": hash_bytes(data)}
+                if entry["hash"] not in sizes_by_hash:
+                    sizes_by_hash[entry["hash"]] = image_size(data)
+
+            current_files[path] = entry
+            current_sizes[entry["hash"]] = sizes_by_hash[entry["hash"]]
+            if current_sizes[entry["hash"]] is not None:
+                url = "/" + relative_path(source_dir, path).replace(os.sep, "/")
+                sizes[url] = list(current_sizes[entry["hash"]])
+
+        cache_dir = os.path.dirname(cache_path)
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({"files": current_files, "sizes": current_sizes}, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, cache_path)
+
+        return cls(sizes)
+
+    def image_props(self, props):
+        props = dict(props)
+        size = self.sizes.get(props.get("src"))
+        if size is not None:
+            props["width"], props["height"] = size
+        props["loading"] = "lazy"
+        props["decoding"] = "async"
+        return props
+
+    def __hash__(self):
+        return hash(self.digest)
+
+    def __eq__(self, other):
+        return isinstance(other, ImageIndex) and self.digest == other.digest
+
+    def __repr__(self):
+        return f"ImageIndex(images: {len(self.sizes)}, digest: {self.digest[:8]})"
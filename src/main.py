@@ -1,90 +1,373 @@
-import sys
+import argparse
 import os 
-import shutil
-from htmlnode import markdown_to_html_node
-
-def copy_static(source_dir, dest_dir):
-    if os.path.exists(dest_dir):
-        shutil.rmtree(dest_dir)
-    
-    os.mkdir(dest_dir)
-    items = os.listdir(source_dir)
-
-    for item in items:
-        source_path = os.path.join(source_dir, item)
-        dest_path = os.path.join(dest_dir, item)
-
-        if os.path.isfile(source_path):
-            shutil.copy(source_path, dest_path)
+from contextlib import nullcontext
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import repeat
+from assets import AssetManifest
+from compress import MIN_SIZE, is_compressible, precompress
+from daemon import BuildDaemon
+from fileindex import FILE_INDEX_PATH, FileIndex, relative_path
+from images import ImageIndex
+from manifest import BuildManifest, manifest_path
+from memo import BlockMemo, MemoStats, install, install_in_worker
+from page import build_page, build_page_indexed, build_page_memoized, build_page_profiled, make_dirs, report_page
+from pipeline import run_pipeline
+from profiler import PROFILE_PATH, BuildProfile
+from search import SearchIndex
+from shard import merge_shards, parse_shard, select_shard, write_shard_manifest
+from stream import build_streamed_page, build_streamed_page_profiled
+from sync import copy_file, files_match, remove_orphans, sync_static
+from template import load_template
+from treecache import TreeCache
+from watch import Watcher
+
+# How to build a set of pages, besides which pages, with which template and
+# under which base path. Every field has a default, so callers name only what
+# they set and nothing depends on argument order.
+BuildOptions = namedtuple("BuildOptions", [
+    "manifest", "jobs", "profile", "tree_cache", "pipeline", "stream_threshold", "memo", "search",
+    "assets", "images", "shard", "direct", "files",
+], defaults=[None, 1, None, None, False, None, None, None, None, None, None, False, None])
+
+def copy_static(source_dir, dest_dir, profile=None, assets=None, files=None):
+    # dest_dir is not emptied first: a file that is already there, with the
+    # size and mtime of its source, is left alone. Returns every output, copied
+    # or not, so the build can remove what it no longer writes.
+    if files is None:
+        files = FileIndex.scan([source_dir])
+
+    os.makedirs(dest_dir, exist_ok=True)
+    for dir_path in files.dirs(source_dir):
+        os.makedirs(os.path.join(dest_dir, relative_path(source_dir, dir_path)), exist_ok=True)
+
+    outputs = []
+
+    for entry in files.files(source_dir):
+        source_path = entry.path
+        dest_path = os.path.join(dest_dir, relative_path(source_dir, source_path))
+        dest_paths = [dest_path]
+        if assets is not None:
+            dest_paths = [os.path.join(os.path.dirname(dest_path), name) for name in assets.dest_names(source_path)]
+        for dest_path in dest_paths:
+            outputs.append(dest_path)
+            start = time.perf_counter()
+            if files_match(source_path, dest_path):
+                if profile is not None:
+                    profile.add_file(dest_path, time.perf_counter() - start, 0)
+                continue
+            copy_file(source_path, dest_path)
+            if profile is not None:
+                profile.add_file(dest_path, time.perf_counter() - start, entry.size)
             print(f"Copied file: {source_path} to {dest_path}")
-        else:
-            os.mkdir(dest_path)
-            copy_static(source_path, dest_path)
-
-def extract_title(markdown):
-    if markdown.startswith("# "):
-        split_markdown = markdown.split("\n") 
-        main_heading = split_markdown[0]
-        main_heading = main_heading.replace('#', '', 1)
-        main_heading = main_heading.strip()
-        return main_heading
-    else:
-        raise Exception("no heading detected")
-    
+    return outputs
+
 def generate_page(from_path, template_path, dest_path, base_path):
-    print(f"Generating page from {from_path} to {dest_path} using {template_path}")
-
-    with open(from_path, 'r') as f:
-        markdown = f.read()
-    
-    with open(template_path, 'r') as f:
-        template = f.read()
-
-    if not dest_path.endswith(".html"):
-        dest_path = os.path.splitext(dest_path)[0] + ".html"
-
-    try:
-        htmlnode = markdown_to_html_node(markdown)
-        html = htmlnode.to_html()
-        html_heading = extract_title(markdown)
-    except Exception as e:
-        print(f"Error parsing Markdown file at {from_path}: {e}")
-        print("Skipping this file.")
+    template = load_template(template_path, base_path)
+    error = build_page(from_path, template, dest_path)
+    return report_page(from_path, template_path, dest_path, error)
+
+def find_pages(dir_path_content, dest_dir_path, files=None):
+    if files is None:
+        files = FileIndex.scan([dir_path_content])
+
+    pages = []
+    for entry in files.files(dir_path_content):
+        rel_path = relative_path(dir_path_content, entry.path)
+        pages.append((entry.path, os.path.join(dest_dir_path, os.path.splitext(rel_path)[0] + ".html")))
+    return pages
+
+def generate_pages(pages, template_path, base_path, options=BuildOptions()):
+    manifest, profile, memo, search = options.manifest, options.profile, options.memo, options.search
+    pending = []
+    built = []
+
+    for from_path, dest_path in pages:
+        entry = None
+        if manifest is not None:
+            entry = manifest.page_entry(from_path, template_path, base_path, assets=options.assets,
+                                        images=options.images, files=options.files)
+            # With a search index, a skipped page also needs its terms from the last build.
+            if manifest.is_fresh(dest_path, entry) and \
+                    (search is None or search.reuse_page(from_path, dest_path, entry["source_hash"])):
+                print(f"Unchanged, skipping {from_path}")
+                manifest.record(dest_path, entry)
+                built.append(dest_path)
+                continue
+        pending.append((from_path, dest_path, entry))
+
+    template = load_template(template_path, base_path, options.assets, options.images)
+    if profile is None:
+        worker = partial(build_page, tree_cache=options.tree_cache, direct=options.direct)
+    else:
+        worker = partial(build_page_profiled, tree_cache=options.tree_cache, direct=options.direct)
+    if search is not None:
+        worker = partial(build_page_indexed, worker)
+
+    memo_stats = None
+    if memo is not None:
+        install(memo)
+        memo_stats = MemoStats()
+        worker = partial(build_page_memoized, worker)
+
+    # Very large sources are streamed one at a time in this process, so their
+    # memory use stays bounded; everything else goes to the chosen executor.
+    streamed = {}
+    if options.stream_threshold is not None:
+        size = os.path.getsize if options.files is None else options.files.size
+        streamed = {index: page for index, page in enumerate(pending)
+                    if size(page[0]) >= options.stream_threshold}
+        pending = [page for index, page in enumerate(pending) if index not in streamed]
+
+    sources = [page[0] for page in pending]
+    dests = [page[1] for page in pending]
+    make_dirs(dests)
+
+    # Results come back in submission order whatever order the workers finish
+    # in, so the log and the manifest are the same as for a serial build.
+    if options.pipeline:
+        results = run_pipeline(sources, template, dests, jobs=options.jobs, tree_cache=options.tree_cache,
+                               profiling=profile is not None, memo=memo, memo_stats=memo_stats,
+                               direct=options.direct, indexing=search is not None)
+    elif options.jobs > 1 and len(pending) > 1:
+        chunksize = max(1, len(pending) // (options.jobs * 4))
+        with ProcessPoolExecutor(max_workers=options.jobs, initializer=install_in_worker,
+                                 initargs=(memo,)) as pool:
+            results = list(pool.map(worker, sources, repeat(template), dests, chunksize=chunksize))
+    else:
+        results = map(worker, sources, repeat(template), dests)
+
+    if memo_stats is not None and not options.pipeline:
+        results = list(results)
+        for result, stats in results:
+            memo_stats.add(stats)
+        results = [result for result, stats in results]
+
+    if streamed:
+        stream_worker = build_streamed_page if profile is None else build_streamed_page_profiled
+        results = list(results)
+        for index in sorted(streamed):
+            from_path, dest_path, entry = streamed[index]
+            pending.insert(index, streamed[index])
+            if search is None:
+                results.insert(index, stream_worker(from_path, template, dest_path, direct=options.direct))
+            else:
+                indexed = {}
+                result = stream_worker(from_path, template, dest_path, direct=options.direct, indexed=indexed)
+                results.insert(index, (result, indexed))
+        if memo_stats is not None:
+            memo_stats.add(memo.stats())
+
+    for (from_path, dest_path, entry), error in zip(pending, results):
+        if search is not None:
+            error, indexed = error
+        if profile is not None:
+            error, timings = error
+            profile.add_page(from_path, timings)
+        if not report_page(from_path, template_path, dest_path, error):
+            continue
+        built.append(dest_path)
+        if manifest is not None:
+            manifest.record(dest_path, entry)
+        if search is not None:
+            search.add_page(from_path, dest_path, indexed, entry["source_hash"] if entry is not None else None)
+
+    if memo_stats is not None:
+        install(None)
+        print(memo_stats.summary())
+    return built
+
+def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, base_path, options=BuildOptions()):
+    if options.files is None:
+        options = options._replace(files=FileIndex.scan([dir_path_content]))
+    pages = find_pages(dir_path_content, dest_dir_path, options.files)
+    if options.shard is not None:
+        pages = select_shard(pages, options.shard, options.files)
+    return generate_pages(pages, template_path, base_path, options)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Build the static site from content/ into docs/.")
+    parser.add_argument("basepath", nargs="?", default="/")
+    parser.add_argument("--incremental", action="store_true",
+                        help="only regenerate pages whose source, template or base path changed "
+                             "and only copy new or changed static files")
+    parser.add_argument("--hash-assets", action="store_true",
+                        help="with --incremental, compare static files by content hash when mtimes differ")
+    parser.add_argument("--hardlink", action="store_true",
+                        help="with --incremental, hardlink static files into docs/ where possible")
+    parser.add_argument("--watch", action="store_true",
+                        help="build, then keep rebuilding affected pages and assets as sources change")
+    parser.add_argument("--daemon", action="store_true",
+                        help="keep the template, rendered pages and file stamps in memory and serve build and "
+                             "render requests from src/client.py over a Unix socket")
+    parser.add_argument("--jobs", "-j", type=int, default=1, metavar="N",
+                        help="generate pages on N worker processes (0 uses every CPU)")
+    parser.add_argument("--profile", nargs="?", const=PROFILE_PATH, metavar="PATH",
+                        help=f"time every stage of every page and static file and save a JSON report "
+                             f"(default {PROFILE_PATH})")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="overlap reading, rendering and writing pages in an asyncio pipeline")
+    parser.add_argument("--stream-threshold", type=int, default=32, metavar="MB",
+                        help="stream sources of at least this size block by block from a memory map "
+                             "(default 32, 0 disables)")
+    parser.add_argument("--tree-cache", action="store_true",
+                        help="reuse parsed Markdown trees from .build-cache/trees when a source is unchanged")
+    parser.add_argument("--tree-cache-size", type=int, default=64, metavar="MB",
+                        help="evict least recently used trees beyond this size (default 64)")
+    parser.add_argument("--direct", action="store_true",
+                        help="render Markdown straight to HTML without building node trees; the output is "
+                             "identical, leave it off for plugins that need the trees")
+    parser.add_argument("--memo-blocks", action="store_true",
+                        help="render each distinct block once per process and reuse the HTML wherever it repeats; "
+                             "with --jobs every worker keeps its own memo")
+    parser.add_argument("--memo-size", type=int, default=16, metavar="MB",
+                        help="evict least recently used fragments beyond this size (default 16)")
+    parser.add_argument("--search-index", action="store_true",
+                        help="write a sharded search index of every page to docs/search/")
+    parser.add_argument("--fingerprint", action="store_true",
+                        help="also copy static files under content-hashed names, write docs/assets.json and point "
+                             "the template and rendered pages at the hashed names")
+    parser.add_argument("--image-hints", action="store_true",
+                        help="give rendered images their width and height from static/ and lazy, async loading")
+    parser.add_argument("--precompress", action="store_true",
+                        help="write a .gz sibling next to every compressible output")
+    parser.add_argument("--precompress-min-size", type=int, default=MIN_SIZE, metavar="BYTES",
+                        help=f"leave files smaller than this uncompressed (default {MIN_SIZE})")
+    parser.add_argument("--output", default="docs", metavar="DIR",
+                        help="write the site to DIR instead of docs/")
+    parser.add_argument("--shard", type=parse_shard, metavar="i/N",
+                        help="build only shard i of N, split by source size, and write a shard manifest; "
+                             "shard 1 also copies the static files")
+    parser.add_argument("--merge", nargs="+", metavar="DIR",
+                        help="merge shard outputs from each DIR into the output directory instead of building")
+    args = parser.parse_args(argv)
+
+    if args.shard is not None and (args.incremental or args.watch or args.search_index):
+        parser.error("--shard cannot be combined with --incremental, --watch or --search-index")
+    if args.watch or args.daemon:
+        # The Watcher renders and copies with none of these, so they would be
+        # silently ignored and produce a different site than a one-shot build.
+        unsupported = [flag for flag, used in [
+            ("--jobs", args.jobs != 1), ("--direct", args.direct), ("--fingerprint", args.fingerprint),
+            ("--image-hints", args.image_hints), ("--search-index", args.search_index),
+            ("--precompress", args.precompress), ("--memo-blocks", args.memo_blocks),
+            ("--tree-cache", args.tree_cache), ("--pipeline", args.pipeline), ("--profile", args.profile),
+            ("--shard", args.shard), ("--merge", args.merge),
+        ] if used]
+        if unsupported:
+            mode = "--watch" if args.watch else "--daemon"
+            parser.error(f"{mode} cannot be combined with {', '.join(unsupported)}")
+    if args.direct and args.tree_cache:
+        parser.error("--direct builds no trees, so it cannot be combined with --tree-cache")
+    return args
+
+def main(argv=None):
+    args = parse_args(argv)
+    jobs = args.jobs if args.jobs > 0 else os.cpu_count() or 1
+
+    if args.watch:
+        Watcher("content", "static", "template.html", args.output, args.basepath).run()
         return
 
-    template = template.replace("{{ Title }}", html_heading)
-    template = template.replace("{{ Content }}", html)
-    template = template.replace('href="/', f'href="{base_path}')
-    template = template.replace('src="/', f'src="{base_path}')
-
-    dest_dir = os.path.dirname(dest_path)
-    if dest_dir and not os.path.exists(dest_dir):
-        os.makedirs(dest_dir)
-
-    with open(dest_path, 'w') as f:
-        f.write(template)
-
-def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, base_path):
-    dir_list = os.listdir(dir_path_content)
-    
-    for item in dir_list:
-        item_path = os.path.join(dir_path_content, item)
-        if os.path.isfile(item_path):
-            dest_file_path = os.path.join(dest_dir_path, os.path.splitext(item)[0] + ".html")
-            generate_page(item_path, template_path, dest_file_path, base_path)
-        else:
-            new_dest_dir_path = os.path.join(dest_dir_path, item)
-            generate_pages_recursive(item_path, template_path, new_dest_dir_path, base_path)
+    if args.daemon:
+        BuildDaemon(Watcher("content", "static", "template.html", args.output, args.basepath)).serve()
+        return
+
+    if args.merge:
+        try:
+            merge_shards(args.merge, args.output)
+        except ValueError as e:
+            raise SystemExit(f"Cannot merge shards: {e}")
+        return
+
+    profile = BuildProfile() if args.profile else None
+    with profile or nullcontext():
+        build(args, jobs, profile)
 
-    
+    if profile is not None:
+        profile.save(args.profile)
+        print(profile.summary())
+        print(f"Saved build profile to {args.profile}")
 
-def main():
-    basepath = "/"
-    if len(sys.argv) > 1:
-        basepath = sys.argv[1]
+def build(args, jobs, profile=None):
+    tree_cache = None
+    if args.tree_cache:
+        tree_cache = TreeCache(max_bytes=args.tree_cache_size * 1024 * 1024)
+
+    stream_threshold = None
+    if args.stream_threshold > 0:
+        stream_threshold = args.stream_threshold * 1024 * 1024
+
+    memo = None
+    if args.memo_blocks:
+        memo = BlockMemo(args.memo_size * 1024 * 1024, args.direct)
+
+    search = None
+    if args.search_index:
+        search = SearchIndex(args.output, args.basepath)
+
+    # content/ and static/ are walked once, and everything below reads the index.
+    files = FileIndex.scan(["content", "static"], FILE_INDEX_PATH)
+
+    assets = None
+    if args.fingerprint:
+        assets = AssetManifest.from_dir("static", files)
+
+    images = None
+    if args.image_hints:
+        images = ImageIndex.from_dir("static", files=files)
+
+    options = BuildOptions(jobs=jobs, profile=profile, tree_cache=tree_cache, pipeline=args.pipeline,
+                           stream_threshold=stream_threshold, memo=memo, search=search, assets=assets,
+                           images=images, shard=args.shard, direct=args.direct, files=files)
+
+    if not args.incremental:
+        # The output is built over the last one rather than into an emptied
+        # directory, so unchanged pages and files keep their mtimes. Whatever
+        # this build did not write is removed at the end.
+        outputs = []
+        if args.shard is None or args.shard[0] == 1:
+            outputs += copy_static("static", args.output, profile=profile, assets=assets, files=files)
+        else:
+            # Static files come from shard 1 only; other shards start empty.
+            os.makedirs(args.output, exist_ok=True)
+        if assets is not None:
+            outputs.append(assets.save(args.output))
+        outputs += generate_pages_recursive("content", "template.html", args.output, args.basepath, options)
+        if search is not None:
+            outputs += search.write()
+        if args.precompress:
+            outputs += precompress([path for path in outputs if is_compressible(path, args.precompress_min_size)],
+                                   jobs)
+        remove_orphans(args.output, outputs)
+        if args.shard is not None:
+            write_shard_manifest(args.output, args.shard)
+    else:
+        manifest = BuildManifest(manifest_path(args.output))
+        sync_static("static", args.output, manifest=manifest, use_hash=args.hash_assets, hardlink=args.hardlink,
+                    profile=profile, assets=assets, files=files)
+        if assets is not None:
+            manifest.record(assets.save(args.output), {"assets": assets.digest})
+        generate_pages_recursive("content", "template.html", args.output, args.basepath,
+                                 options._replace(manifest=manifest))
+        if search is not None:
+            for path in search.write():
+                manifest.record(path, {"search_index": True})
+        if args.precompress:
+            outputs = [path for path in sorted(manifest.outputs)
+                       if os.path.isfile(path) and is_compressible(path, args.precompress_min_size)]
+            for path, gz_path in zip(outputs, precompress(outputs, jobs)):
+                manifest.record(gz_path, {"gzip_of": path})
+        manifest.remove_stale()
+        manifest.save()
 
-    copy_static("static", "docs")
-    generate_pages_recursive("content", "template.html", "docs", basepath)
+    files.save()
+    if search is not None:
+        search.save()
+    if tree_cache is not None:
+        tree_cache.prune()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,118 @@
+import hashlib
+import json
+import os
+
+# Bump whenever a change to the parser or renderer alters generated HTML, so
+# incremental builds know that every existing output is out of date.
+GENERATOR_VERSION = "4"
+
+MANIFEST_DIR = os.path.join(".build-cache", "manifests")
+MANIFEST_PATH = os.path.join(MANIFEST_DIR, "docs", "manifest.json")
+
+def hash_bytes(data):
+    return hashlib.sha256(data).hexdigest()
+
+def hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def output_stamp(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+def manifest_path(output_dir):
+    # Every output directory keeps its own manifest, so an incremental build
+    # into one never takes the outputs of another for stale ones.
+    output_dir = os.path.abspath(output_dir)
+    rel_path = os.path.relpath(output_dir)
+    if rel_path == os.curdir or rel_path.split(os.sep)[0] == os.pardir:
+        rel_path = "_" + hash_bytes(output_dir.encode())[:16]
+    return os.path.join(MANIFEST_DIR, rel_path, "manifest.json")
+
+def remove_empty_dirs(dir_path):
+    while dir_path:
+        try:
+            os.rmdir(dir_path)
+        except OSError:
+            return
+        dir_path = os.path.dirname(dir_path)
+
+class BuildManifest:
+    def __init__(self, path=MANIFEST_PATH):
+        self.path = path
+        self.previous = {}
+        self.previous_stamps = {}
+        self.outputs = {}
+        self.template_hashes = {}
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        if isinstance(data, dict) and isinstance(data.get("outputs"), dict):
+            self.previous = data["outputs"]
+            self.previous_stamps = data.get("stamps", {})
+
+    def page_entry(self, source_path, template_path, base_path, assets=None, images=None, files=None):
+        if template_path not in self.template_hashes:
+            self.template_hashes[template_path] = hash_file(template_path)
+
+        return {
+            "source": source_path,
+            "source_hash": hash_file(source_path) if files is None else files.hash(source_path),
+            "template_hash": self.template_hashes[template_path],
+            "base_path": base_path,
+            "assets": assets.digest if assets is not None else None,
+            "images": images.digest if images is not None else None,
+            "generator_version": GENERATOR_VERSION,
+        }
+
+    def is_fresh(self, dest_path, entry):
+        # The output must also be exactly as this manifest left it: a full,
+        # watch or daemon build in between may have rewritten it with other
+        # options without updating the manifest.
+        stamp = output_stamp(dest_path)
+        return stamp is not None and self.previous.get(dest_path) == entry and \
+            self.previous_stamps.get(dest_path) == stamp
+
+    def record(self, dest_path, entry):
+        self.outputs[dest_path] = entry
+
+    def stale_outputs(self):
+        return sorted(set(self.previous) - set(self.outputs))
+
+    def remove_stale(self):
+        removed = []
+        for dest_path in self.stale_outputs():
+            if os.path.isfile(dest_path):
+                os.remove(dest_path)
+                print(f"Removed stale output: {dest_path}")
+                removed.append(dest_path)
+                remove_empty_dirs(os.path.dirname(dest_path))
+        return removed
+
+    def save(self):
+        manifest_dir = os.path.dirname(self.path)
+        if manifest_dir:
+            os.makedirs(manifest_dir, exist_ok=True)
+
+        stamps = {}
+        for dest_path in self.outputs:
+            stamp = output_stamp(dest_path)
+            if stamp is not None:
+                stamps[dest_path] = stamp
+
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({"outputs": self.outputs, "stamps": stamps}, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
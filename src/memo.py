@@ -0,0 +1,94 @@
+import os
+from collections import OrderedDict
+from emit import emit_block
+from htmlnode import create_blocknode
+from textnode import block_text, scan_blocks
+
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+
+# The memo used by this process. Worker processes get a copy of the parent's
+# memo through their pool initializer and fill it in as they go. The copies are
+# not shared: a block repeated across pages is rendered once per worker that
+# meets it, so --jobs N renders it at most N times rather than once.
+_active_memo = None
+
+def install(memo):
+    global _active_memo
+    _active_memo = memo
+
+def active_memo():
+    return _active_memo
+
+def install_in_worker(memo):
+    # A forked worker starts with the parent's counters; count only its own lookups.
+    if memo is not None:
+        memo.hits = 0
+        memo.misses = 0
+    install(memo)
+
+class BlockMemo:
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, direct=False):
+        self.max_bytes = max_bytes
+        self.direct = direct
+        self.fragments = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def fragment(self, block, block_type, base_path="/", assets=None, images=None):
+        key = (block_type, block, base_path, assets, images)
+        html = self.fragments.get(key)
+        if html is not None:
+            self.fragments.move_to_end(key)
+            self.hits += 1
+            return html
+
+        self.misses += 1
+        if self.direct:
+            html = emit_block(block, block_type, base_path, assets, images)
+        else:
+            html = create_blocknode(block, block_type).to_html(base_path, assets, images)
+        entry_size = len(block) + len(html)
+        if entry_size > self.max_bytes:
+            return html
+
+        self.fragments[key] = html
+        self.size += entry_size
+        while self.size > self.max_bytes:
+            (old_type, old_block, *old_context), old_html = self.fragments.popitem(last=False)
+            self.size -= len(old_block) + len(old_html)
+        return html
+
+    def render(self, markdown, base_path="/", assets=None, images=None):
+        parts = ["<div>"]
+        for span in scan_blocks(markdown):
+            parts.append(self.fragment(block_text(markdown, span), span.block_type, base_path, assets, images))
+        parts.append("</div>")
+        return "".join(parts)
+
+    def stats(self):
+        return os.getpid(), self.hits, self.misses
+
+class MemoStats:
+    # Each process reports its running totals; the latest report per process wins.
+    def __init__(self):
+        self.processes = {}
+
+    def add(self, stats):
+        if stats is not None:
+            pid, hits, misses = stats
+            self.processes[pid] = (hits, misses)
+
+    def totals(self):
+        hits = sum(counts[0] for counts in self.processes.values())
+        misses = sum(counts[1] for counts in self.processes.values())
+        return hits, misses
+
+    def summary(self):
+        hits, misses = self.totals()
+        lookups = hits + misses
+        rate = hits / lookups * 100 if lookups else 0.0
+        summary = f"Block memo: {hits} hits, {misses} misses ({rate:.1f}% hit rate"
+        if len(self.processes) > 1:
+            summary += f", one memo in each of {len(self.processes)} processes"
+        return summary + ")"
@@ -0,0 +1,121 @@
+import os
+from emit import markdown_to_html
+from htmlnode import markdown_to_html_node
+from memo import active_memo
+from profiler import StageClock
+from search import page_terms, search_entry, tree_terms
+
+def extract_title(markdown):
+    if markdown.startswith("# "):
+        split_markdown = markdown.split("\n") 
+        main_heading = split_markdown[0]
+        main_heading = main_heading.replace('#', '', 1)
+        main_heading = main_heading.strip()
+        return main_heading
+    else:
+        raise Exception("no heading detected")
+    
+def render_page(markdown, template, clock=None, tree_cache=None, direct=False, indexed=None):
+    clock = clock or StageClock()
+    memo = active_memo()
+    htmlnode = None
+    if tree_cache is None and memo is not None:
+        # Memoised fragments skip the node tree, so parsing is timed as rendering.
+        html = memo.render(markdown, template.base_path, template.assets, template.images)
+    elif tree_cache is None and direct:
+        html = markdown_to_html(markdown, template.base_path, template.assets, template.images)
+    else:
+        if tree_cache is not None:
+            htmlnode = tree_cache.parse(markdown)
+        else:
+            htmlnode = markdown_to_html_node(markdown)
+        clock.lap("parse")
+        html = htmlnode.to_html(template.base_path, template.assets, template.images)
+    clock.lap("render", len(html))
+    html_heading = extract_title(markdown)
+    clock.lap("template")
+    if indexed is not None:
+        # Search terms come off the tree while it is still in memory.
+        terms = tree_terms(htmlnode) if htmlnode is not None else page_terms(markdown)
+        indexed.update(search_entry(html_heading, terms))
+        clock.lap("index")
+    return {"Title": html_heading, "Content": html}
+
+def build_page(from_path, template, dest_path, timings=None, tree_cache=None, direct=False, indexed=None):
+    with StageClock(timings) as clock:
+        with open(from_path, 'r') as f:
+            markdown = f.read()
+        clock.lap("read", len(markdown))
+
+        if not dest_path.endswith(".html"):
+            dest_path = os.path.splitext(dest_path)[0] + ".html"
+
+        try:
+            values = render_page(markdown, template, clock, tree_cache, direct, indexed)
+        except Exception as e:
+            return str(e)
+
+        written = write_page(dest_path, template, values)
+        clock.lap("write", written)
+        return None
+
+def build_page_profiled(from_path, template, dest_path, tree_cache=None, direct=False, indexed=None):
+    timings = {}
+    error = build_page(from_path, template, dest_path, timings, tree_cache, direct, indexed)
+    return error, timings
+
+def build_page_indexed(worker, *args):
+    # Counts the page's search terms in the worker that already holds its
+    # source, and sends them back with the result.
+    indexed = {}
+    return worker(*args, indexed=indexed), indexed
+
+def build_page_memoized(worker, *args):
+    # Reports this process's memo counters alongside every result, so the
+    # parent can add up hit rates across worker processes.
+    return worker(*args), active_memo().stats()
+
+def make_dirs(paths):
+    # One makedirs per distinct output directory, up front, instead of a check
+    # before every page.
+    for dir_path in sorted({os.path.dirname(path) for path in paths}):
+        if dir_path:
+            os.makedirs(dir_path, exist_ok=True)
+
+def same_content(path, data):
+    try:
+        if os.path.getsize(path) != len(data):
+            return False
+        with open(path, 'rb') as f:
+            return f.read() == data
+    except FileNotFoundError:
+        return False
+
+def write_page(dest_path, template, values):
+    # An identical page is left alone, so its mtime and anything watching it
+    # see no change. Otherwise the page is written beside the old one and
+    # renamed over it, so an interrupted build never leaves half a page.
+    data = template.render(values).encode()
+    if same_content(dest_path, data):
+        return 0
+
+    tmp_path = dest_path + ".tmp"
+    try:
+        f = open(tmp_path, 'wb')
+    except FileNotFoundError:
+        os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+        f = open(tmp_path, 'wb')
+    with f:
+        f.write(data)
+    os.replace(tmp_path, dest_path)
+    return len(data)
+
+def report_page(from_path, template_path, dest_path, error):
+    print(f"Generating page from {from_path} to {dest_path} using {template_path}")
+
+    if error is not None:
+        print(f"Error parsing Markdown file at {from_path}: {error}")
+        print("Skipping this file.")
+        return False
+
+    return True
@@ -0,0 +1,116 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from memo import active_memo, install_in_worker
+from page import render_page, write_page
+from profiler import StageClock, add_timing
+
+def read_source(from_path):
+    with open(from_path, 'r') as f:
+        return f.read()
+
+def render_source(markdown, template, tree_cache=None, profiling=False, direct=False, indexing=False):
+    timings = {} if profiling else None
+    indexed = {} if indexing else None
+    with StageClock(timings) as clock:
+        try:
+            values = render_page(markdown, template, clock, tree_cache, direct, indexed)
+        except Exception as e:
+            return None, str(e), timings, memo_stats(), None
+    return values, None, timings, memo_stats(), indexed
+
+def memo_stats():
+    memo = active_memo()
+    return memo.stats() if memo is not None else None
+
+async def run_stage(inbox, outbox, workers, downstream_workers, handle):
+    async def work():
+        while True:
+            item = await inbox.get()
+            if item is None:
+                return
+            result = await handle(item)
+            if outbox is not None and result is not None:
+                await outbox.put(result)
+
+    await asyncio.gather(*(work() for _ in range(workers)))
+    if outbox is not None:
+        for _ in range(downstream_workers):
+            await outbox.put(None)
+
+async def run_pipeline_async(sources, template, dests, jobs=1, tree_cache=None, profiling=False,
+                             io_workers=8, queue_size=32, memo=None, memo_stats=None, direct=False, indexing=False):
+    loop = asyncio.get_running_loop()
+    errors = [None] * len(sources)
+    entries = [None] * len(sources)
+    timings = [{} for _ in sources]
+    render_workers = max(1, jobs)
+
+    # Bounded queues give backpressure: reading can only run queue_size pages
+    # ahead of rendering, and rendering only queue_size pages ahead of writing.
+    read_queue = asyncio.Queue(queue_size)
+    render_queue = asyncio.Queue(queue_size)
+    write_queue = asyncio.Queue(queue_size)
+
+    if jobs > 1:
+        cpu_pool = ProcessPoolExecutor(max_workers=jobs, initializer=install_in_worker, initargs=(memo,))
+    else:
+        # The single render thread shares this process's memo.
+        cpu_pool = ThreadPoolExecutor(max_workers=1)
+
+    async def discover():
+        for index in range(len(sources)):
+            await read_queue.put(index)
+        for _ in range(io_workers):
+            await read_queue.put(None)
+
+    async def read(index):
+        start = time.perf_counter()
+        markdown = await loop.run_in_executor(io_pool, read_source, sources[index])
+        add_timing(timings[index], "read", time.perf_counter() - start, len(markdown))
+        return index, markdown
+
+    async def render(item):
+        index, markdown = item
+        values, error, render_timings, stats, entries[index] = await loop.run_in_executor(
+            cpu_pool, render_source, markdown, template, tree_cache, profiling, direct, indexing)
+        if memo_stats is not None:
+            memo_stats.add(stats)
+        if render_timings:
+            timings[index].update(render_timings)
+        if error is not None:
+            errors[index] = error
+            return None
+        return index, values
+
+    async def write(item):
+        index, values = item
+        dest_path = dests[index]
+        if not dest_path.endswith(".html"):
+            dest_path = os.path.splitext(dest_path)[0] + ".html"
+
+        start = time.perf_counter()
+        written = await loop.run_in_executor(io_pool, write_page, dest_path, template, values)
+        add_timing(timings[index], "write", time.perf_counter() - start, written)
+
+    with ThreadPoolExecutor(max_workers=io_workers) as io_pool, cpu_pool:
+        await asyncio.gather(
+            discover(),
+            run_stage(read_queue, render_queue, io_workers, render_workers, read),
+            run_stage(render_queue, write_queue, render_workers, io_workers, render),
+            run_stage(write_queue, None, io_workers, 0, write),
+        )
+
+    results = errors
+    if profiling:
+        results = list(zip(errors, timings))
+    # Results take the same shape as build_page_indexed's.
+    if indexing:
+        results = list(zip(results, entries))
+    return results
+
+def run_pipeline(sources, template, dests, jobs=1, tree_cache=None, profiling=False, io_workers=8, queue_size=32,
+                 memo=None, memo_stats=None, direct=False, indexing=False):
+    return asyncio.run(run_pipeline_async(sources, template, dests, jobs, tree_cache, profiling,
+                                          io_workers, queue_size, memo, memo_stats, direct, indexing))
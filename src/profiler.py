@@ -0,0 +1,133 @@
+import json
+import os
+import time
+from contextlib import contextmanager
+
+PROFILE_PATH = os.path.join(".build-cache", "profile.json")
+
+# Where section() records: the timings of the page being built, if any, else
+# the build-wide sections of the active profile.
+_page_timings = None
+_active_profile = None
+
+def add_timing(timings, stage, seconds, nbytes=0):
+    entry = timings.setdefault(stage, {"seconds": 0.0, "bytes": 0})
+    entry["seconds"] += seconds
+    entry["bytes"] += nbytes
+
+@contextmanager
+def section(name, nbytes=0):
+    # Hook for plugins: time a block of work under its own name. Costs nothing
+    # when the build is not being profiled.
+    timings = _page_timings
+    if timings is None and _active_profile is not None:
+        timings = _active_profile.sections
+
+    if timings is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        add_timing(timings, name, time.perf_counter() - start, nbytes)
+
+class StageClock:
+    def __init__(self, timings=None):
+        self.timings = timings
+        self.last = time.perf_counter()
+
+    def __enter__(self):
+        global _page_timings
+        self.previous = _page_timings
+        _page_timings = self.timings
+        self.last = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        global _page_timings
+        _page_timings = self.previous
+
+    def lap(self, stage, nbytes=0):
+        if self.timings is None:
+            return
+
+        now = time.perf_counter()
+        add_timing(self.timings, stage, now - self.last, nbytes)
+        self.last = now
+
+class BuildProfile:
+    def __init__(self):
+        self.pages = {}
+        self.files = {}
+        self.sections = {}
+        self.started = time.perf_counter()
+        self.finished = None
+
+    def __enter__(self):
+        global _active_profile
+        _active_profile = self
+        return self
+
+    def __exit__(self, *exc_info):
+        global _active_profile
+        _active_profile = None
+        self.finished = time.perf_counter()
+
+    def add_page(self, path, timings):
+        self.pages[path] = timings
+
+    def add_file(self, path, seconds, nbytes):
+        self.files[path] = {"seconds": seconds, "bytes": nbytes}
+
+    def stage_totals(self):
+        totals = {}
+        for timings in self.pages.values():
+            for stage, entry in timings.items():
+                add_timing(totals, stage, entry["seconds"], entry["bytes"])
+        for stage, entry in self.sections.items():
+            add_timing(totals, stage, entry["seconds"], entry["bytes"])
+        if self.files:
+            add_timing(totals, "copy_static",
+                       sum(entry["seconds"] for entry in self.files.values()),
+                       sum(entry["bytes"] for entry in self.files.values()))
+        return totals
+
+    def slowest_pages(self, limit=5):
+        def page_seconds(item):
+            return sum(entry["seconds"] for entry in item[1].values())
+
+        ranked = sorted(self.pages.items(), key=page_seconds, reverse=True)
+        return [(path, page_seconds((path, timings))) for path, timings in ranked[:limit]]
+
+    def report(self):
+        finished = self.finished if self.finished is not None else time.perf_counter()
+        return {
+            "total_seconds": finished - self.started,
+            "stages": self.stage_totals(),
+            "pages": self.pages,
+            "files": self.files,
+            "sections": self.sections,
+        }
+
+    def summary(self, limit=5):
+        lines = ["Slowest stages:"]
+        totals = self.stage_totals()
+        for stage in sorted(totals, key=lambda stage: totals[stage]["seconds"], reverse=True)[:limit]:
+            entry = totals[stage]
+            lines.append(f"  {stage}: {entry['seconds'] * 1000:.1f} ms, {entry['bytes']} bytes")
+
+        lines.append("Slowest pages:")
+        for path, seconds in self.slowest_pages(limit):
+            lines.append(f"  {path}: {seconds * 1000:.1f} ms")
+
+        return "\n".join(lines)
+
+    def save(self, path=PROFILE_PATH):
+        profile_dir = os.path.dirname(path)
+        if profile_dir:
+            os.makedirs(profile_dir, exist_ok=True)
+
+        with open(path, 'w') as f:
+            json.dump(self.report(), f, indent=2, sort_keys=True)
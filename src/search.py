@@ -0,0 +1,149 @@
+import json
+import os
+import re
+from collections import Counter
+from htmlnode import create_blocknode
+from profiler import section
+from textnode import block_text, scan_blocks
+
+SEARCH_CACHE_PATH = os.path.join(".build-cache", "search.json")
+SEARCH_DIR = "search"
+
+TOKEN_PATTERN = re.compile(r"\w+")
+SHARD_PATTERN = re.compile(r"[a-z0-9]+")
+PREFIX_LENGTH = 2
+
+# Output layout, under docs/search/:
+#   docs.json      [[url, title], ...]; a document's id is its position here
+#   <shard>.json   {term: [id deltas, counts]} for every term whose first
+#                  PREFIX_LENGTH characters give shard_name(term)
+# A browser looks up a term by fetching just its shard, then turns the deltas
+# back into ids with a running sum.
+
+def shard_name(term):
+    prefix = term[:PREFIX_LENGTH]
+    if SHARD_PATTERN.fullmatch(prefix):
+        return prefix
+    return "_" + prefix.encode().hex()
+
+def tree_terms(node):
+    # Only the visible text, read off a page's rendered tree: leaf text and
+    # image alt text, but no tags, link targets or image URLs.
+    texts = []
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if node.children:
+            stack.extend(node.children)
+        elif node.tag == "img":
+            texts.append((node.props or {}).get("alt", ""))
+        elif node.value:
+            texts.append(node.value)
+    return Counter(TOKEN_PATTERN.findall("\n".join(texts).lower()))
+
+def page_terms(markdown):
+    # The same terms for renderers that keep no tree, one block at a time.
+    terms = Counter()
+    for span in scan_blocks(markdown):
+        terms.update(tree_terms(create_blocknode(block_text(markdown, span), span.block_type)))
+    return terms
+
+def search_entry(title, terms):
+    return {"title": title, "terms": dict(terms)}
+
+def delta_encode(ids):
+    deltas = []
+    previous = 0
+    for doc_id in ids:
+        deltas.append(doc_id - previous)
+        previous = doc_id
+    return deltas
+
+def page_url(dest_path, dest_dir, base_path):
+    url = os.path.relpath(dest_path, dest_dir).replace(os.sep, "/")
+    if url == "index.html":
+        url = ""
+    elif url.endswith("/index.html"):
+        url = url[:-len("index.html")]
+    return base_path + url
+
+class SearchIndex:
+    def __init__(self, dest_dir, base_path="/", cache_path=SEARCH_CACHE_PATH):
+        self.dest_dir = dest_dir
+        self.base_path = base_path
+        self.cache_path = cache_path
+        self.previous = {}
+        self.pages = {}
+        self.indexed = 0
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.cache_path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        if isinstance(data, dict) and isinstance(data.get("pages"), dict):
+            self.previous = data["pages"]
+
+    def add_page(self, from_path, dest_path, entry, source_hash=None):
+        # entry comes from search_entry, run by whichever worker rendered the
+        # page. The source hash lets a later incremental build reuse it.
+        self.pages[from_path] = dict(entry, source_hash=source_hash,
+                                     url=page_url(dest_path, self.dest_dir, self.base_path))
+        self.indexed += 1
+
+    def reuse_page(self, from_path, dest_path, source_hash):
+        # A page an incremental build skips keeps the terms it was last indexed
+        # with, as long as its source is unchanged. Otherwise it has to be
+        # rendered again to be indexed.
+        entry = self.previous.get(from_path)
+        if entry is None or source_hash is None or entry.get("source_hash") != source_hash:
+            return False
+        self.pages[from_path] = dict(entry, url=page_url(dest_path, self.dest_dir, self.base_path))
+        return True
+
+    def shards(self):
+        docs = sorted(self.pages.values(), key=lambda entry: entry["url"])
+        postings = {}
+        for doc_id, entry in enumerate(docs):
+            for term, count in entry["terms"].items():
+                postings.setdefault(term, []).append((doc_id, count))
+
+        shards = {}
+        for term in sorted(postings):
+            ids = [doc_id for doc_id, count in postings[term]]
+            counts = [count for doc_id, count in postings[term]]
+            shards.setdefault(shard_name(term), {})[term] = [delta_encode(ids), counts]
+
+        return [[entry["url"], entry["title"]] for entry in docs], shards
+
+    def write(self):
+        search_dir = os.path.join(self.dest_dir, SEARCH_DIR)
+        os.makedirs(search_dir, exist_ok=True)
+
+        written = []
+        with section("search_index"):
+            docs, shards = self.shards()
+            files = {"docs": docs}
+            files.update(shards)
+
+            for name, data in files.items():
+                path = os.path.join(search_dir, name + ".json")
+                with open(path, 'w') as f:
+                    json.dump(data, f, separators=(",", ":"), ensure_ascii=False)
+                written.append(path)
+
+        print(f"Search index: {len(docs)} pages ({self.indexed} reindexed), {len(shards)} shards")
+        return written
+
+    def save(self):
+        cache_dir = os.path.dirname(self.cache_path)
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+        tmp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({"pages": self.pages}, f, sort_keys=True)
+        os.replace(tmp_path, self.cache_path)
@@ -0,0 +1,119 @@
+import argparse
+import json
+import os
+import shutil
+from manifest import hash_file
+from sync import copy_file
+
+SHARD_MANIFEST_NAME = ".shard-manifest.json"
+MERGE_MANIFEST_PATH = os.path.join(".build-cache", "shards.json")
+
+def parse_shard(text):
+    try:
+        index, count = (int(part) for part in text.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected i/N, got {text!r}")
+    if not 1 <= index <= count:
+        raise argparse.ArgumentTypeError(f"shard {index} is not between 1 and {count}")
+    return index, count
+
+def assign_shards(pages, count, files=None):
+    # Largest sources first, each to the currently lightest shard. Ties go by
+    # path and by shard number, so every machine computes the same split.
+    shards = [[] for _ in range(count)]
+    totals = [0] * count
+    size = os.path.getsize if files is None else files.size
+    sized = sorted(((size(page[0]), page) for page in pages), key=lambda item: (-item[0], item[1]))
+    for size, page in sized:
+        lightest = min(range(count), key=lambda shard: (totals[shard], shard))
+        shards[lightest].append(page)
+        totals[lightest] += size
+    return shards
+
+def select_shard(pages, shard, files=None):
+    index, count = shard
+    selected = set(assign_shards(pages, count, files)[index - 1])
+    # Keep discovery order, so the shard's log reads like a slice of a full build.
+    return [page for page in pages if page in selected]
+
+def list_outputs(dest_dir):
+    outputs = {}
+    for root, dirs, files in os.walk(dest_dir):
+        dirs.sort()
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            rel_path = os.path.relpath(path, dest_dir).replace(os.sep, "/")
+            if rel_path != SHARD_MANIFEST_NAME:
+                outputs[rel_path] = hash_file(path)
+    return outputs
+
+def write_shard_manifest(dest_dir, shard):
+    index, count = shard
+    path = os.path.join(dest_dir, SHARD_MANIFEST_NAME)
+    with open(path, 'w') as f:
+        json.dump({"shard": index, "shards": count, "outputs": list_outputs(dest_dir)}, f, indent=2,
+                  sort_keys=True)
+    return path
+
+def load_shard_manifest(shard_dir):
+    with open(os.path.join(shard_dir, SHARD_MANIFEST_NAME), 'r') as f:
+        return json.load(f)
+
+def overlaps(dir_path, other_path):
+    dir_path, other_path = os.path.realpath(dir_path), os.path.realpath(other_path)
+    return os.path.commonpath([dir_path, other_path]) in (dir_path, other_path)
+
+def merge_shards(shard_dirs, dest_dir, manifest_path=MERGE_MANIFEST_PATH):
+    # dest_dir is emptied before anything is copied, so it must not hold, or
+    # be inside, any of the shards being merged.
+    for shard_dir in shard_dirs:
+        if overlaps(shard_dir, dest_dir):
+            raise ValueError(f"cannot merge {shard_dir} into {dest_dir}, which overlaps it")
+
+    manifests = [load_shard_manifest(shard_dir) for shard_dir in shard_dirs]
+
+    counts = {manifest["shards"] for manifest in manifests}
+    if len(counts) != 1:
+        raise ValueError(f"shards come from different splits: {sorted(counts)}")
+    count = counts.pop()
+    indexes = sorted(manifest["shard"] for manifest in manifests)
+    if indexes != list(range(1, count + 1)):
+        raise ValueError(f"expected shards 1 to {count}, got {indexes}")
+
+    for shard_dir, manifest in zip(shard_dirs, manifests):
+        on_disk = list_outputs(shard_dir)
+        changed = sorted(set(on_disk.items()) ^ set(manifest["outputs"].items()))
+        if changed:
+            paths = sorted({rel_path for rel_path, digest in changed})
+            raise ValueError(f"{shard_dir} does not match its shard manifest: {', '.join(paths)}")
+
+    # Every output must come from one shard, or be identical in all of them.
+    owners = {}
+    conflicts = []
+    for shard_dir, manifest in zip(shard_dirs, manifests):
+        for rel_path, digest in sorted(manifest["outputs"].items()):
+            if rel_path not in owners:
+                owners[rel_path] = (shard_dir, digest)
+            elif owners[rel_path][1] != digest:
+                conflicts.append(f"{rel_path} ({owners[rel_path][0]}, {shard_dir})")
+    if conflicts:
+        raise ValueError("conflicting outputs: " + ", ".join(conflicts))
+
+    if os.path.exists(dest_dir):
+        shutil.rmtree(dest_dir)
+    os.mkdir(dest_dir)
+
+    for rel_path, (shard_dir, digest) in sorted(owners.items()):
+        dest_path = os.path.join(dest_dir, rel_path)
+        os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+        copy_file(os.path.join(shard_dir, rel_path), dest_path)
+
+    manifest_dir = os.path.dirname(manifest_path)
+    if manifest_dir:
+        os.makedirs(manifest_dir, exist_ok=True)
+    with open(manifest_path, 'w') as f:
+        json.dump({"shards": count, "outputs": {rel_path: digest for rel_path, (shard_dir, digest) in owners.items()}},
+                  f, indent=2, sort_keys=True)
+
+    print(f"Merged {len(owners)} files from {count} shards into {dest_dir}")
+    return sorted(owners)
@@ -0,0 +1,121 @@
+import filecmp
+import mmap
+import os
+import re
+from collections import Counter
+from emit import emit_block
+from htmlnode import create_blocknode
+from memo import active_memo
+from page import build_page, extract_title
+from profiler import StageClock
+from search import page_terms, search_entry
+from textnode import block_text, find_closing_fence, opens_fence, scan_blocks
+
+# Pages at least this large are rendered block by block from a memory map.
+STREAM_THRESHOLD = 32 * 1024 * 1024
+
+NON_SPACE_PATTERN = re.compile(rb"\S")
+
+def iter_block_sources(buffer):
+    # Cuts the buffer at the same blank lines scan_blocks would, extending
+    # fenced code blocks to their closing fence, and decodes one piece at a
+    # time. scan_blocks then runs on each piece on its own.
+    length = len(buffer)
+    pos = 0
+
+    while pos < length:
+        separator = buffer.find(b"\n\n", pos)
+        if separator == -1:
+            separator = length
+
+        first = NON_SPACE_PATTERN.search(buffer, pos, separator)
+        if first is not None and buffer[first.start():first.start() + 3] == b"```":
+            first_line_end = buffer.find(b"\n", first.start(), separator)
+            if first_line_end == -1:
+                first_line_end = separator
+            if opens_fence(buffer[first.start():first_line_end]):
+                closing = find_closing_fence(buffer, first_line_end)
+                if closing is not None and closing.start() > separator:
+                    separator = buffer.find(b"\n\n", closing.end())
+                    if separator == -1:
+                        separator = length
+
+        if first is not None:
+            yield buffer[pos:separator].decode()
+        pos = separator + 2
+
+class MarkdownStream:
+    def __init__(self, buffer, direct=False):
+        self.buffer = buffer
+        self.direct = direct
+        self.blocks = 0
+
+    def iter_html(self, base_path="/", assets=None, images=None):
+        memo = active_memo()
+        yield "<div>"
+        for source in iter_block_sources(self.buffer):
+            for span in scan_blocks(source):
+                block = block_text(source, span)
+                if memo is not None:
+                    html = memo.fragment(block, span.block_type, base_path, assets, images)
+                elif self.direct:
+                    html = emit_block(block, span.block_type, base_path, assets, images)
+                else:
+                    html = create_blocknode(block, span.block_type).to_html(base_path, assets, images)
+                self.blocks += 1
+                yield html
+        yield "</div>"
+
+def read_title(buffer):
+    first_line_end = buffer.find(b"\n")
+    if first_line_end == -1:
+        first_line_end = len(buffer)
+    return extract_title(buffer[:first_line_end].decode())
+
+def build_streamed_page(from_path, template, dest_path, timings=None, direct=False, indexed=None):
+    if not dest_path.endswith(".html"):
+        dest_path = os.path.splitext(dest_path)[0] + ".html"
+
+    dest_dir = os.path.dirname(dest_path)
+    if dest_dir:
+        os.makedirs(dest_dir, exist_ok=True)
+
+    tmp_path = dest_path + ".tmp"
+    with StageClock(timings) as clock, open(from_path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return "no heading detected"
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            # Text mode would translate \r\n line endings; leave those files to
+            # the regular path rather than translating them here.
+            if buffer.find(b"\r") != -1:
+                return build_page(from_path, template, dest_path, timings, direct=direct, indexed=indexed)
+
+            try:
+                title = read_title(buffer)
+                with open(tmp_path, 'w') as out:
+                    written = template.write(out, {"Title": title, "Content": MarkdownStream(buffer, direct)})
+            except Exception as e:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                return str(e)
+
+            if indexed is not None:
+                terms = Counter()
+                for source in iter_block_sources(buffer):
+                    terms.update(page_terms(source))
+                indexed.update(search_entry(title, terms))
+
+        # Like write_page, leave an identical page untouched.
+        if os.path.isfile(dest_path) and filecmp.cmp(tmp_path, dest_path, shallow=False):
+            os.remove(tmp_path)
+        else:
+            os.replace(tmp_path, dest_path)
+        clock.lap("stream", written)
+    return None
+
+def build_streamed_page_profiled(from_path, template, dest_path, direct=False, indexed=None):
+    timings = {}
+    error = build_streamed_page(from_path, template, dest_path, timings, direct, indexed)
+    return error, timings
@@ -0,0 +1,140 @@
+import os
+import shutil
+import time
+from fileindex import FileIndex, relative_path
+from manifest import hash_file
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# ioctl request number for FICLONE on Linux (btrfs, xfs, bcachefs, ...).
+FICLONE = 0x40049409
+
+def files_match(source_path, dest_path, use_hash=False):
+    try:
+        source_stat = os.stat(source_path)
+        dest_stat = os.stat(dest_path)
+    except FileNotFoundError:
+        return False
+
+    if source_stat.st_size != dest_stat.st_size:
+        return False
+
+    if (source_stat.st_dev, source_stat.st_ino) == (dest_stat.st_dev, dest_stat.st_ino):
+        return True
+
+    if source_stat.st_mtime_ns == dest_stat.st_mtime_ns:
+        return True
+
+    if use_hash:
+        return hash_file(source_path) == hash_file(dest_path)
+
+    return False
+
+def _clone(fsrc, fdst):
+    if fcntl is None:
+        return False
+
+    try:
+        fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+    except OSError:
+        return False
+    return True
+
+def _copy_range(fsrc, fdst):
+    if not hasattr(os, "copy_file_range"):
+        return False
+
+    remaining = os.fstat(fsrc.fileno()).st_size
+    try:
+        while remaining > 0:
+            copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+            if copied == 0:
+                break
+            remaining -= copied
+    except OSError:
+        fsrc.seek(0)
+        fdst.seek(0)
+        fdst.truncate()
+        return False
+    return remaining == 0
+
+def copy_file(source_path, dest_path, hardlink=False):
+    # Never write into an existing output in place: it may be a hardlink that
+    # shares its inode with the source.
+    if os.path.lexists(dest_path):
+        os.remove(dest_path)
+
+    if hardlink:
+        try:
+            os.link(source_path, dest_path)
+            return "link"
+        except OSError:
+            pass
+
+    with open(source_path, 'rb') as fsrc, open(dest_path, 'wb') as fdst:
+        if _clone(fsrc, fdst):
+            method = "reflink"
+        elif _copy_range(fsrc, fdst):
+            method = "copy_file_range"
+        else:
+            shutil.copyfileobj(fsrc, fdst)
+            method = "copy"
+
+    # Copying the mtime lets the next sync detect an unchanged file from one stat.
+    shutil.copystat(source_path, dest_path)
+    return method
+
+def sync_static(source_dir, dest_dir, manifest=None, use_hash=False, hardlink=False, profile=None, assets=None,
+                files=None):
+    if files is None:
+        files = FileIndex.scan([source_dir])
+
+    copied = []
+    os.makedirs(dest_dir, exist_ok=True)
+    for dir_path in files.dirs(source_dir):
+        os.makedirs(os.path.join(dest_dir, relative_path(source_dir, dir_path)), exist_ok=True)
+
+    # Sorted by path components, the order of a sorted walk of each directory.
+    for entry in sorted(files.files(source_dir), key=lambda entry: entry.path.split(os.sep)):
+        source_path = entry.path
+        dest_path = os.path.join(dest_dir, relative_path(source_dir, source_path))
+        dest_paths = [dest_path]
+        if assets is not None:
+            dest_paths = [os.path.join(os.path.dirname(dest_path), name) for name in assets.dest_names(source_path)]
+
+        for dest_path in dest_paths:
+            if manifest is not None:
+                manifest.record(dest_path, {"source": source_path})
+
+            start = time.perf_counter()
+            if files_match(source_path, dest_path, use_hash):
+                if profile is not None:
+                    profile.add_file(dest_path, time.perf_counter() - start, 0)
+                continue
+
+            method = copy_file(source_path, dest_path, hardlink)
+            if profile is not None:
+                profile.add_file(dest_path, time.perf_counter() - start, entry.size)
+            print(f"Copied file: {source_path} to {dest_path} ({method})")
+            copied.append(dest_path)
+
+    return copied
+
+def remove_orphans(dest_dir, outputs):
+    # Removes every file under dest_dir that this build did not write, and
+    # any directory left empty.
+    outputs = {os.path.normpath(path) for path in outputs}
+    removed = []
+    for root, dirs, files in os.walk(dest_dir, topdown=False):
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            if os.path.normpath(path) not in outputs:
+                os.remove(path)
+                print(f"Removed orphaned output: {path}")
+                removed.append(path)
+        if root != dest_dir and not os.listdir(root):
+            os.rmdir(root)
+    return removed
@@ -0,0 +1,69 @@
+import re
+from htmlnode import rebase_url
+
+SLOT_PATTERN = re.compile(r"\{\{ (\w+) \}\}")
+URL_ATTR_PATTERN = re.compile(r'\b(href|src)="(/[^"]*)"')
+
+def rewrite_links(html, base_path, assets=None):
+    if base_path == "/" and assets is None:
+        return html
+
+    return URL_ATTR_PATTERN.sub(
+        lambda match: f'{match.group(1)}="{rebase_url(match.group(2), base_path, assets)}"', html)
+
+class Template:
+    def __init__(self, segments, slots, base_path="/", assets=None, images=None):
+        if len(segments) != len(slots) + 1:
+            raise ValueError("a template needs one more literal segment than slots")
+
+        self.segments = segments
+        self.slots = slots
+        self.base_path = base_path
+        self.assets = assets
+        self.images = images
+
+    def chunks(self, values):
+        yield self.segments[0]
+        for slot, segment in zip(self.slots, self.segments[1:]):
+            value = values.get(slot, f"{{{{ {slot} }}}}")
+            # Node trees and other streams are written out chunk by chunk.
+            if hasattr(value, "iter_html"):
+                yield from value.iter_html(self.base_path, self.assets, self.images)
+            else:
+                yield value
+            yield segment
+
+    def render(self, values):
+        return "".join(self.chunks(values))
+
+    def write(self, f, values):
+        written = 0
+        for chunk in self.chunks(values):
+            if chunk:
+                f.write(chunk)
+                written += len(chunk)
+        return written
+
+    def __repr__(self):
+        return f"Template(slots: {self.slots}, base_path: {self.base_path})"
+
+    def __eq__(self, other):
+        if not isinstance(other, Template):
+            return False
+
+        return (self.segments == other.segments and
+                self.slots == other.slots and
+                self.base_path == other.base_path and
+                self.assets == other.assets and
+                self.images == other.images)
+
+def compile_template(text, base_path="/", assets=None, images=None):
+    # The template's own links are rewritten here, once per build, rather than
+    # on every rendered page.
+    text = rewrite_links(text, base_path, assets)
+    parts = SLOT_PATTERN.split(text)
+    return Template(parts[0::2], parts[1::2], base_path, assets, images)
+
+def load_template(template_path, base_path="/", assets=None, images=None):
+    with open(template_path, 'r') as f:
+        return compile_template(f.read(), base_path, assets, images)
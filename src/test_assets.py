@@ -0,0 +1,91 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+from assets import AssetManifest, fingerprint_name
+from htmlnode import markdown_to_html_node
+from main import copy_static
+from manifest import hash_file
+from memo import BlockMemo
+from sync import sync_static
+from template import compile_template
+from textnode import BlockType
+
+class TestAssetManifest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.static = os.path.join(self.tmp.name, "static")
+        os.makedirs(os.path.join(self.static, "images"))
+        with open(os.path.join(self.static, "index.css"), 'w') as f:
+            f.write("body {}")
+        with open(os.path.join(self.static, "images", "a.png"), 'wb') as f:
+            f.write(b"png")
+        self.assets = AssetManifest.from_dir(self.static)
+        self.css_hash = hash_file(os.path.join(self.static, "index.css"))[:8]
+        self.png_hash = hash_file(os.path.join(self.static, "images", "a.png"))[:8]
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_fingerprint_name(self):
+        self.assertEqual(fingerprint_name("index.css", "0123456789abcdef"), "index.01234567.css")
+        self.assertEqual(fingerprint_name("LICENSE", "0123456789abcdef"), "LICENSE.01234567")
+
+    def test_urls_map_to_hashed_names(self):
+        self.assertEqual(self.assets.urls, {
+            "/index.css": f"/index.{self.css_hash}.css",
+            "/images/a.png": f"/images/a.{self.png_hash}.png",
+        })
+        self.assertEqual(self.assets.dest_names(os.path.join(self.static, "images", "a.png")),
+                         ["a.png", f"a.{self.png_hash}.png"])
+        self.assertEqual(self.assets.resolve("/missing.png"), "/missing.png")
+
+    def test_digest_follows_content(self):
+        self.assertEqual(AssetManifest.from_dir(self.static), self.assets)
+        with open(os.path.join(self.static, "index.css"), 'w') as f:
+            f.write("body { margin: 0 }")
+        changed = AssetManifest.from_dir(self.static)
+        self.assertNotEqual(changed, self.assets)
+        self.assertNotEqual(hash(changed), hash(self.assets))
+
+    def test_save(self):
+        path = self.assets.save(self.tmp.name)
+        with open(path) as f:
+            self.assertEqual(json.load(f), self.assets.urls)
+
+    def test_static_files_keep_their_own_names(self):
+        # Nothing rewrites the CSS url() or robots.txt, so both must still resolve.
+        with open(os.path.join(self.static, "index.css"), 'w') as f:
+            f.write('body { background: url("images/a.png") }')
+        with open(os.path.join(self.static, "robots.txt"), 'w') as f:
+            f.write("User-agent: *")
+        assets = AssetManifest.from_dir(self.static)
+        for copy in (copy_static, sync_static):
+            dest = os.path.join(self.tmp.name, copy.__name__)
+            with redirect_stdout(io.StringIO()):
+                copy(self.static, dest, assets=assets)
+            for url in ["/robots.txt", "/index.css", "/images/a.png"] + list(assets.urls.values()):
+                self.assertTrue(os.path.isfile(dest + url), url)
+
+    def test_template_and_pages_use_hashed_urls(self):
+        template = compile_template('<link href="/index.css">{{ Content }}', "/site/", self.assets)
+        content = markdown_to_html_node("![a](/images/a.png) [css](/index.css) [home](/)")
+        rendered = template.render({"Content": content})
+        self.assertIn(f'<link href="/site/index.{self.css_hash}.css">', rendered)
+        self.assertIn(f'src="/site/images/a.{self.png_hash}.png"', rendered)
+        self.assertIn(f'href="/site/index.{self.css_hash}.css"', rendered)
+        self.assertIn('href="/site/"', rendered)
+
+    def test_memo_keys_on_assets(self):
+        memo = BlockMemo()
+        plain = memo.fragment("![a](/images/a.png)", BlockType.paragraph)
+        hashed = memo.fragment("![a](/images/a.png)", BlockType.paragraph, "/", self.assets)
+        self.assertIn("/images/a.png", plain)
+        self.assertIn(f"/images/a.{self.png_hash}.png", hashed)
+        self.assertEqual(memo.misses, 2)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+import gzip
+import io
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+
+import compress
+from compress import find_compressible, precompress
+
+class TestPrecompress(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.dest = os.path.join(self.root, "docs")
+        self.cache_dir = os.path.join(self.root, "gzip")
+        self.files = {
+            "index.html": b"<p>hello</p>" * 200,
+            "blog/post/index.html": b"<p>post</p>" * 200,
+            "index.css": b"body { margin: 0; }\n" * 100,
+            "small.html": b"<p>tiny</p>",
+            "images/photo.png": b"\x89PNG" * 1000,
+        }
+        for name, data in self.files.items():
+            path = os.path.join(self.dest, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb') as f:
+                f.write(data)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def run_precompress(self):
+        paths = find_compressible(self.dest)
+        log = io.StringIO()
+        with redirect_stdout(log):
+            gz_paths = precompress(paths, jobs=2, cache_dir=self.cache_dir)
+        return paths, gz_paths, log.getvalue()
+
+    def test_finds_large_compressible_files_only(self):
+        paths = find_compressible(self.dest)
+        names = sorted(os.path.relpath(path, self.dest) for path in paths)
+        self.assertEqual(names, [os.path.join("blog", "post", "index.html"), "index.css", "index.html"])
+
+    def test_writes_matching_gzip_siblings(self):
+        paths, gz_paths, log = self.run_precompress()
+        self.assertEqual(gz_paths, [path + ".gz" for path in paths])
+        for path in paths:
+            with open(path, 'rb') as f, gzip.open(path + ".gz", 'rb') as gz:
+                self.assertEqual(gz.read(), f.read())
+        self.assertIn("3 compressed, 0 reused, 0 unchanged", log)
+
+    def test_output_is_deterministic(self):
+        paths, gz_paths, log = self.run_precompress()
+        with open(gz_paths[0], 'rb') as f:
+            first = f.read()
+        os.remove(gz_paths[0])
+        self.run_precompress()
+        with open(gz_paths[0], 'rb') as f:
+            self.assertEqual(f.read(), first)
+
+    def test_unchanged_content_is_not_recompressed(self):
+        self.run_precompress()
+        os.remove(os.path.join(self.dest, "index.css.gz"))
+        with mock.patch.object(compress.gzip, "compress", wraps=gzip.compress) as gzip_compress:
+            paths, gz_paths, log = self.run_precompress()
+        gzip_compress.assert_not_called()
+        self.assertIn("0 compressed, 1 reused, 2 unchanged", log)
+
+    def test_changed_content_is_recompressed(self):
+        self.run_precompress()
+        with open(os.path.join(self.dest, "index.html"), 'wb') as f:
+            f.write(b"<p>changed</p>" * 200)
+        paths, gz_paths, log = self.run_precompress()
+        self.assertIn("1 compressed, 0 reused, 2 unchanged", log)
+        with gzip.open(os.path.join(self.dest, "index.html.gz"), 'rb') as gz:
+            self.assertEqual(gz.read(), b"<p>changed</p>" * 200)
+
+    def test_builds_keep_each_others_blobs(self):
+        # Another shard's outputs are not in this build's paths.
+        self.run_precompress()
+        with redirect_stdout(io.StringIO()):
+            precompress([os.path.join(self.dest, "index.css")], cache_dir=self.cache_dir)
+        self.assertEqual(len(os.listdir(self.cache_dir)), 3)
+
+    def test_prune_evicts_least_recently_used_beyond_max_bytes(self):
+        self.run_precompress()
+        blobs = sorted(os.path.join(self.cache_dir, name) for name in os.listdir(self.cache_dir))
+        for age, blob_path in enumerate(blobs):
+            os.utime(blob_path, ns=(age, age))
+        self.assertEqual(compress.prune_cache(self.cache_dir, os.path.getsize(blobs[2])), 2)
+        self.assertEqual(os.listdir(self.cache_dir), [os.path.basename(blobs[2])])
+        self.assertEqual(compress.prune_cache(self.cache_dir), 0)
+
+    def test_blob_removed_by_another_build_is_not_an_error(self):
+        real_replace = os.replace
+        def replace(src, dst):
+            if dst.startswith(self.cache_dir):
+                raise FileNotFoundError(src)
+            real_replace(src, dst)
+        with mock.patch.object(compress.os, "replace", side_effect=replace):
+            paths, gz_paths, log = self.run_precompress()
+        self.assertIn("3 compressed", log)
+        self.assertTrue(all(os.path.isfile(gz_path) for gz_path in gz_paths))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import io
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+from bench import run_scenario
+from corpus import generate_corpus
+from htmlnode import markdown_to_html_node
+from page import extract_title
+
+class TestCorpus(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def read_tree(self, root):
+        files = {}
+        for dir_path, dirs, names in os.walk(root):
+            for name in names:
+                path = os.path.join(dir_path, name)
+                with open(path, 'rb') as f:
+                    files[os.path.relpath(path, root)] = f.read()
+        return files
+
+    def test_deterministic(self):
+        first = os.path.join(self.tmp.name, "a")
+        second = os.path.join(self.tmp.name, "b")
+        generate_corpus(first, pages=10, seed=7)
+        generate_corpus(second, pages=10, seed=7)
+        self.assertEqual(self.read_tree(first), self.read_tree(second))
+
+    def test_shape(self):
+        root = self.tmp.name
+        corpus = generate_corpus(root, pages=9, blocks=5, depth=3, fanout=2, links=3, images=2,
+                                 static_files=2, static_size=100)
+        self.assertEqual(corpus["pages"], 9)
+
+        pages = [path for path in self.read_tree(os.path.join(root, "content"))]
+        self.assertEqual(len(pages), 9)
+        self.assertTrue(all(path.count(os.sep) == 4 for path in pages))
+        self.assertEqual(os.path.getsize(os.path.join(root, "static", "images", "image1.png")), 100)
+
+    def test_pages_parse(self):
+        root = self.tmp.name
+        generate_corpus(root, pages=3, blocks=30, inline_density=0.5, depth=0)
+        for dir_path, dirs, names in os.walk(os.path.join(root, "content")):
+            for name in names:
+                with open(os.path.join(dir_path, name)) as f:
+                    markdown = f.read()
+                self.assertTrue(extract_title(markdown).startswith("Page "))
+                self.assertIn("<a href=", markdown_to_html_node(markdown).to_html())
+
+    def test_run_scenario(self):
+        with redirect_stdout(io.StringIO()):
+            result = run_scenario({"pages": 4, "blocks": 3, "static_files": 1, "static_size": 10}, repeat=1)
+        self.assertEqual(result["pages"], 4)
+        self.assertEqual(
+            sorted(result["stages"]),
+            ["copy_static", "generate_pages_recursive", "parse", "read", "render", "write"]
+        )
+        self.assertGreater(result["output_bytes"], result["markdown_bytes"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+import io
+import os
+import tempfile
+import threading
+import time
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+
+import watch
+from client import send_request
+from daemon import BuildDaemon
+from watch import Watcher
+
+class TestBuildDaemon(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = self.tmp.name
+        self.content = os.path.join(root, "content")
+        self.static = os.path.join(root, "static")
+        self.dest = os.path.join(root, "docs")
+        self.template = os.path.join(root, "template.html")
+        self.socket_path = os.path.join(root, "daemon.sock")
+        os.makedirs(self.content)
+        os.makedirs(self.static)
+        self.write(self.template, "<title>{{ Title }}</title>{{ Content }}")
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\n[About](/about)")
+        self.write(os.path.join(self.static, "index.css"), "body {}")
+
+        watcher = Watcher(self.content, self.static, self.template, self.dest, "/site/")
+        self.daemon = BuildDaemon(watcher, self.socket_path)
+        self.thread = threading.Thread(target=self.serve)
+        self.thread.start()
+        while not os.path.exists(self.socket_path):
+            time.sleep(0.01)
+
+    def serve(self):
+        with redirect_stdout(io.StringIO()):
+            self.daemon.serve()
+
+    def tearDown(self):
+        send_request({"command": "stop"}, self.socket_path)
+        self.thread.join()
+        self.tmp.cleanup()
+
+    def write(self, path, text, mtime_ns=None):
+        with open(path, 'w') as f:
+            f.write(text)
+        if mtime_ns is not None:
+            os.utime(path, ns=(mtime_ns, mtime_ns))
+
+    def request(self, command, **fields):
+        return send_request(dict(command=command, **fields), self.socket_path)
+
+    def test_first_build_is_full_then_incremental(self):
+        response = self.request("build")
+        self.assertTrue(response["ok"])
+        self.assertEqual(len(response["outputs"]), 2)
+        self.assertIn("Generating page from", response["log"])
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "index.html")))
+
+        self.assertEqual(self.request("build")["outputs"], [])
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nEdited", mtime_ns=1)
+        self.assertEqual(self.request("build")["outputs"], [os.path.join(self.dest, "index.html")])
+
+    def test_render_uses_warm_pages(self):
+        self.request("build")
+        with mock.patch.object(watch, "render_page") as render_page:
+            response = self.request("render", path=os.path.join(self.content, "index.md"))
+        render_page.assert_not_called()
+        self.assertEqual(response["html"], '<title>Home</title><div><h1>Home</h1><p><a href="/site/about">About</a></p></div>')
+
+    def test_errors_are_reported(self):
+        response = self.request("render", path=os.path.join(self.content, "missing.md"))
+        self.assertFalse(response["ok"])
+        self.assertIn("No such file", response["error"])
+        self.assertFalse(self.request("unknown")["ok"])
+        self.assertTrue(self.request("build")["ok"])
+
+    def test_render_rejects_paths_outside_content(self):
+        os.symlink(self.template, os.path.join(self.content, "link.md"))
+        for path in (self.template, os.path.join(self.content, "..", "template.html"),
+                     os.path.join(self.content, "link.md")):
+            with self.subTest(path=path):
+                response = self.request("render", path=path)
+                self.assertFalse(response["ok"])
+                self.assertIn("is not under", response["error"])
+
+    def test_failed_build_is_retried(self):
+        self.request("build")
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nEdited", mtime_ns=1)
+        self.write(os.path.join(self.static, "index.css"), "body { margin: 0; }", mtime_ns=1)
+        with mock.patch.object(self.daemon.watcher, "copy_asset", side_effect=RuntimeError("disk full")):
+            response = self.request("build")
+        self.assertFalse(response["ok"])
+        self.assertEqual(self.request("build")["outputs"], [os.path.join(self.dest, "index.css")])
+
+    def test_second_daemon_refuses_to_start(self):
+        with self.assertRaises(SystemExit):
+            BuildDaemon(self.daemon.watcher, self.socket_path).serve()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import glob
+import os
+import random
+import tempfile
+import unittest
+
+from assets import AssetManifest
+from corpus import generate_corpus
+from emit import emit_block, markdown_to_html
+from htmlnode import create_blocknode, markdown_to_html_node
+from images import ImageIndex
+from textnode import BlockType
+
+SAMPLES = [
+    "# Title\n\nSome **bold**, _italic_, *also* and `code`.",
+    "A [link](/blog) and ![img](/a.png) and [out](https://x.org)",
+    "```\ncode\n\n<a href=\"/x\">\n```",
+    "> quoted **text**\n> more",
+    "- one\n- two with [link](/a)\n* three",
+    "1. one\n2. two\n3. ",
+    "    indented\n    paragraph",
+    "###### six\n\n####### seven",
+    "",
+    "**unclosed and _mixed* delimiters`",
+]
+
+class TestDirectEmitter(unittest.TestCase):
+    def assertMatchesTree(self, markdown, *args):
+        self.assertEqual(markdown_to_html(markdown, *args), markdown_to_html_node(markdown).to_html(*args))
+
+    def test_samples_match_tree(self):
+        for markdown in SAMPLES:
+            with self.subTest(markdown=markdown):
+                self.assertMatchesTree(markdown)
+                self.assertMatchesTree(markdown, "/site/")
+
+    def test_corpus_matches_tree(self):
+        with tempfile.TemporaryDirectory() as root:
+            generate_corpus(root, pages=20, static_files=0, seed=5)
+            for path in glob.glob(os.path.join(root, "**", "*.md"), recursive=True):
+                with open(path) as f:
+                    self.assertMatchesTree(f.read(), "/site/")
+
+    def test_random_markdown_matches_tree(self):
+        pieces = ["**", "*", "_", "`", "[x](/a)", "![i](/a.png)", "# ", "\n", "\n\n", "- ", "1. ", "> ",
+                  "```", "    ", "a", "b c", " ", "!", "[", "]", "(", ")"]
+        rng = random.Random(0)
+        for _ in range(2000):
+            markdown = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 30)))
+            self.assertMatchesTree(markdown, "/site/")
+
+    def test_assets_and_images_match_tree(self):
+        assets = AssetManifest({"/a.png": "/a.1234.png"})
+        images = ImageIndex({"/a.png": [3, 4]})
+        self.assertMatchesTree("![i](/a.png) ![x](/b.png) [a](/a.png)", "/site/", assets, images)
+
+    def test_emit_block_matches_create_blocknode(self):
+        for block, block_type in (("## Head *x*", BlockType.heading), ("```\nx\n```", BlockType.code),
+                                  ("- a\n- b", BlockType.unordered_list), ("> q", BlockType.quote)):
+            self.assertEqual(emit_block(block, block_type), create_blocknode(block, block_type).to_html())
+
+if __name__ == "__main__":
+    unittest.main()
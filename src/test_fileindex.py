@@ -0,0 +1,79 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import fileindex
+from fileindex import FileIndex
+from main import find_pages
+from manifest import hash_file
+
+def find_pages_listdir(dir_path, dest_dir_path):
+    pages = []
+    for item in os.listdir(dir_path):
+        item_path = os.path.join(dir_path, item)
+        if os.path.isfile(item_path):
+            pages.append((item_path, os.path.join(dest_dir_path, os.path.splitext(item)[0] + ".html")))
+        else:
+            pages.extend(find_pages_listdir(item_path, os.path.join(dest_dir_path, item)))
+    return pages
+
+class TestFileIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.static = os.path.join(self.tmp.name, "static")
+        self.cache_path = os.path.join(self.tmp.name, "cache", "files.json")
+        for rel_path in ("index.md", "blog/post.md", "blog/2024/old.md", "about.v2/index.md"):
+            self.write(os.path.join(self.content, rel_path), f"# {rel_path}")
+        self.write(os.path.join(self.static, "css", "index.css"), "body {}")
+        os.makedirs(os.path.join(self.static, "empty"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, path, text, mtime_ns=None):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            f.write(text)
+        if mtime_ns is not None:
+            os.utime(path, ns=(mtime_ns, mtime_ns))
+
+    def test_scan_records_files_and_dirs(self):
+        index = FileIndex.scan([self.content, self.static])
+        css = os.path.join(self.static, "css", "index.css")
+        self.assertEqual(index.files(self.static), [fileindex.FileEntry(css, 7, os.stat(css).st_mtime_ns)])
+        self.assertEqual(sorted(index.dirs(self.static)),
+                         [os.path.join(self.static, "css"), os.path.join(self.static, "empty")])
+        self.assertEqual(len(index.files(self.content)), 4)
+        self.assertEqual(index.size(css), 7)
+
+    def test_find_pages_matches_listdir_walk(self):
+        dest = os.path.join(self.tmp.name, "docs")
+        self.assertEqual(find_pages(self.content, dest), find_pages_listdir(self.content, dest))
+
+    def test_unchanged_files_are_not_hashed_again(self):
+        index = FileIndex.scan([self.content], self.cache_path)
+        index_md = os.path.join(self.content, "index.md")
+        post_md = os.path.join(self.content, "blog", "post.md")
+        self.assertEqual(index.hash(index_md), hash_file(index_md))
+        index.hash(post_md)
+        index.save()
+
+        self.write(post_md, "# Edited", mtime_ns=1)
+        index = FileIndex.scan([self.content], self.cache_path)
+        with mock.patch.object(fileindex, "hash_file", wraps=fileindex.hash_file) as hash_file_mock:
+            self.assertEqual(index.hash(index_md), hash_file(index_md))
+            self.assertEqual(index.hash(post_md), hash_file(post_md))
+        hash_file_mock.assert_called_once_with(post_md)
+
+    def test_missing_or_corrupt_cache_is_ignored(self):
+        os.makedirs(os.path.dirname(self.cache_path))
+        self.write(self.cache_path, "{not json")
+        index = FileIndex.scan([self.content], self.cache_path)
+        self.assertEqual(index.hashes, {})
+        index.save()
+        self.assertEqual(FileIndex.scan([self.content], self.cache_path).hashes, {})
+
+if __name__ == "__main__":
+    unittest.main()
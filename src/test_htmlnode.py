@@ -1,3 +1,4 @@
+import io
 import unittest
 
 from htmlnode import (
@@ -178,6 +179,69 @@ class TestHTMLnode(unittest.TestCase):
         node = ParentNode("div", [])
         self.assertEqual(node.to_html(), "<div></div>")
 
+    def test_nodes_have_no_instance_dict(self):
+        for node in (HTMLNode("p", "x"), LeafNode("b", "x"), ParentNode("div", [])):
+            self.assertFalse(hasattr(node, "__dict__"))
+            with self.assertRaises(AttributeError):
+                node.extra = 1
+
+    def test_tags_are_interned(self):
+        tag = "".join(["sec", "tion"])
+        self.assertIs(ParentNode(tag, []).tag, LeafNode("section", "x").tag)
+        self.assertEqual(ParentNode(tag, []), ParentNode("section", []))
+
+    def test_iter_html_chunks(self):
+        node = ParentNode("p", [LeafNode("b", "Bold"), LeafNode(None, " text")])
+        self.assertEqual(list(node.iter_html()), ["<p>", "<b>Bold</b>", " text", "</p>"])
+
+    def test_iter_html_mixed_node_types(self):
+        node = HTMLNode("div", None, [
+            HTMLNode("p", "intro ", [LeafNode("a", "link", {"href": "/x"})]),
+            ParentNode("ul", [ParentNode("li", [LeafNode(None, "item")])]),
+        ])
+        self.assertEqual(
+            node.to_html(),
+            '<div><p>intro <a href="/x">link</a></p><ul><li>item</li></ul></div>'
+        )
+
+    def test_write_html(self):
+        node = markdown_to_html_node("# Title\n\nSome **bold** text")
+        buffer = io.StringIO()
+        node.write_html(buffer)
+        self.assertEqual(buffer.getvalue(), node.to_html())
+
+    def test_iter_html_is_lazy(self):
+        node = ParentNode("div", [LeafNode("p", "ok"), ParentNode(None, [])])
+        chunks = node.iter_html()
+        self.assertEqual(next(chunks), "<div>")
+        self.assertEqual(next(chunks), "<p>ok</p>")
+        with self.assertRaises(ValueError):
+            next(chunks)
+
+    def test_base_path_rewrites_url_props(self):
+        node = markdown_to_html_node("A [link](/blog) and ![img](/a.png) and [out](https://x.org)")
+        self.assertEqual(
+            node.to_html("/site/"),
+            '<div><p>A <a href="/site/blog">link</a> and <img alt="img" src="/site/a.png"></img> '
+            'and <a href="https://x.org">out</a></p></div>'
+        )
+        self.assertEqual(node, markdown_to_html_node("A [link](/blog) and ![img](/a.png) and [out](https://x.org)"))
+
+    def test_base_path_leaves_code_text_alone(self):
+        node = markdown_to_html_node('```\n<a href="/x">\n```\n\nSee `src="/y"`')
+        self.assertEqual(node.to_html("/site/"), node.to_html())
+        self.assertIn('href="/x"', node.to_html("/site/"))
+
+    def test_base_path_on_html_node_props(self):
+        node = HTMLNode("div", None, [LeafNode("a", "x", {"href": "/x"})], {"src": "/y", "class": "/z"})
+        self.assertEqual(node.to_html("/b/"), '<div src="/b/y" class="/z"><a href="/b/x">x</a></div>')
+
+    def test_very_deep_tree(self):
+        node = LeafNode(None, "x")
+        for _ in range(5000):
+            node = ParentNode("span", [node])
+        self.assertEqual(node.to_html(), "<span>" * 5000 + "x" + "</span>" * 5000)
+
 class TestBlockToHTML(unittest.TestCase):
     def test_paragraphs(self):
         md = """
@@ -211,6 +275,15 @@ the **same** even with inline stuff
             "<div><pre><code>This is text that _should_ remain\nthe **same** even with inline stuff\n</code></pre></div>",
         )
 
+    def test_codeblock_with_blank_line(self):
+        md = "```\nline one\n\nline two\n```"
+        node = markdown_to_html_node(md)
+        self.assertEqual(node.to_html(), "<div><pre><code>line one\n\nline two\n</code></pre></div>")
+
+    def test_unclosed_codeblock_keeps_later_lines(self):
+        md = "```\nx = 1\n\nprint(x)  # then close: ```\n\nmore"
+        self.assertIn("<p>print(x)  # then close: ", markdown_to_html_node(md).to_html())
+
     def test_headings(self):
         md = """
 # Heading 1
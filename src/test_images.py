@@ -0,0 +1,84 @@
+import os
+import struct
+import tempfile
+import unittest
+from unittest import mock
+
+import images
+from htmlnode import markdown_to_html_node
+from images import ImageIndex, image_size
+
+def png(width, height):
+    return b"\x89PNG\r\n\x1a\n" + struct.pack(">I", 13) + b"IHDR" + struct.pack(">II", width, height) + b"\x08\x06\x00\x00\x00"
+
+def gif(width, height):
+    return b"GIF89a" + struct.pack("<HH", width, height) + b"\x00" * 10
+
+def jpeg(width, height):
+    app0 = b"\xff\xe0" + struct.pack(">H", 16) + b"JFIF\x00" + b"\x00" * 9
+    dqt = b"\xff\xdb" + struct.pack(">H", 4) + b"\x00\x00"
+    sof = b"\xff\xc2" + struct.pack(">HBHHB", 11, 8, height, width, 3) + b"\x00" * 3
+    return b"\xff\xd8" + app0 + dqt + sof + b"\xff\xd9"
+
+class TestImageSize(unittest.TestCase):
+    def test_png(self):
+        self.assertEqual(tuple(image_size(png(1026, 388))), (1026, 388))
+
+    def test_gif(self):
+        self.assertEqual(tuple(image_size(gif(3, 2))), (3, 2))
+
+    def test_jpeg_skips_segments_before_frame(self):
+        self.assertEqual(tuple(image_size(jpeg(640, 480))), (640, 480))
+
+    def test_unknown_or_truncated(self):
+        self.assertIsNone(image_size(b"not an image"))
+        self.assertIsNone(image_size(jpeg(640, 480)[:24]))
+        self.assertIsNone(image_size(png(1026, 388)[:20]))
+        self.assertIsNone(image_size(gif(3, 2)[:8]))
+
+class TestImageIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.static = os.path.join(self.tmp.name, "static")
+        self.cache_path = os.path.join(self.tmp.name, "cache", "images.json")
+        os.makedirs(os.path.join(self.static, "images"))
+        self.write("images/a.png", png(10, 20))
+        self.write("images/b.jpg", jpeg(30, 40))
+        self.write("index.css", b"body {}")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, name, data):
+        with open(os.path.join(self.static, name), 'wb') as f:
+            f.write(data)
+
+    def test_indexes_images_by_url(self):
+        index = ImageIndex.from_dir(self.static, self.cache_path)
+        self.assertEqual(index.sizes, {"/images/a.png": [10, 20], "/images/b.jpg": [30, 40]})
+
+    def test_unchanged_images_are_not_read_again(self):
+        first = ImageIndex.from_dir(self.static, self.cache_path)
+        with mock.patch.object(images, "hash_bytes", wraps=images.hash_bytes) as hash_bytes:
+            second = ImageIndex.from_dir(self.static, self.cache_path)
+        # Only the index digest itself is hashed.
+        self.assertEqual(hash_bytes.call_count, 1)
+        self.assertEqual(second, first)
+
+        self.write("images/a.png", png(11, 20) + b"\x00")
+        changed = ImageIndex.from_dir(self.static, self.cache_path)
+        self.assertEqual(changed.sizes["/images/a.png"], [11, 20])
+        self.assertNotEqual(changed, first)
+
+    def test_rendered_images_get_hints(self):
+        index = ImageIndex.from_dir(self.static, self.cache_path)
+        node = markdown_to_html_node("![a](/images/a.png) and ![x](https://x.org/x.png)")
+        self.assertEqual(
+            node.to_html("/site/", None, index),
+            '<div><p><img alt="a" decoding="async" height="20" loading="lazy" src="/site/images/a.png" '
+            'width="10"></img> and <img alt="x" decoding="async" loading="lazy" src="https://x.org/x.png"></img></p></div>'
+        )
+        self.assertNotIn("loading", node.to_html("/site/"))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,29 +1,146 @@
+import io
+import os
+import subprocess
+import sys
+import tempfile
 import unittest
-from main import extract_title
-
-class TestExtractTitle(unittest.TestCase):
-    
-    def test_simple_title(self):
-        markdown = "# Hello World"
-        self.assertEqual(extract_title(markdown), "Hello World")
-    
-    def test_title_with_spaces(self):
-        markdown = "#    Lots of Spaces    "
-        self.assertEqual(extract_title(markdown), "Lots of Spaces")
-    
-    def test_multiline_markdown(self):
-        markdown = "# The Title\n\nThis is some content.\n\n## Subtitle"
-        self.assertEqual(extract_title(markdown), "The Title")
-    
-    def test_no_title(self):
-        markdown = "This is just text without a title"
-        with self.assertRaises(Exception):
-            extract_title(markdown)
-    
-    def test_title_not_at_beginning(self):
-        markdown = "Some text\n# Title"
-        with self.assertRaises(Exception):
-            extract_title(markdown)
+from contextlib import redirect_stderr, redirect_stdout
+from main import BuildOptions, find_pages, generate_pages_recursive, parse_args
+from memo import BlockMemo
+
+MAIN = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+
+class TestParallelBuild(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.content = os.path.join(self.root, "content")
+        self.template = os.path.join(self.root, "template.html")
+        with open(self.template, 'w') as f:
+            f.write('<title>{{ Title }}</title><link href="/index.css"><article>{{ Content }}</article>')
+
+        for i in range(12):
+            page_dir = os.path.join(self.content, "blog", f"post{i}")
+            os.makedirs(page_dir)
+            with open(os.path.join(page_dir, "index.md"), 'w') as f:
+                f.write(f"# Post {i}\n\nSome **bold** text and a [link](/blog/post{i}).\n\n- one\n- two")
+
+        with open(os.path.join(self.content, "broken.md"), 'w') as f:
+            f.write("no heading here")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def build(self, dest_name, jobs, pipeline=False, memo=None, direct=False):
+        dest = os.path.join(self.root, dest_name)
+        log = io.StringIO()
+        with redirect_stdout(log):
+            options = BuildOptions(jobs=jobs, pipeline=pipeline, memo=memo, direct=direct)
+            generate_pages_recursive(self.content, self.template, dest, "/base/", options)
+
+        outputs = {}
+        for from_path, dest_path in find_pages(self.content, dest):
+            if os.path.exists(dest_path):
+                with open(dest_path, 'rb') as f:
+                    outputs[os.path.relpath(dest_path, dest)] = f.read()
+        return outputs, log.getvalue().replace(dest, "<dest>")
+
+    def test_find_pages_maps_sources_to_html(self):
+        pages = find_pages(self.content, "docs")
+        self.assertEqual(len(pages), 13)
+        self.assertIn((os.path.join(self.content, "broken.md"), os.path.join("docs", "broken.html")), pages)
+
+    def test_parallel_output_matches_serial(self):
+        serial_outputs, serial_log = self.build("serial", jobs=1)
+        parallel_outputs, parallel_log = self.build("parallel", jobs=4)
+
+        self.assertEqual(len(serial_outputs), 12)
+        self.assertEqual(serial_outputs, parallel_outputs)
+        self.assertEqual(serial_log, parallel_log)
+
+    def test_pipeline_output_matches_serial(self):
+        serial_outputs, serial_log = self.build("serial", jobs=1)
+        for jobs in (1, 2):
+            with self.subTest(jobs=jobs):
+                outputs, log = self.build(f"pipeline{jobs}", jobs=jobs, pipeline=True)
+                self.assertEqual(outputs, serial_outputs)
+                self.assertEqual(log, serial_log)
+
+    def test_memo_output_matches_serial(self):
+        serial_outputs, serial_log = self.build("serial", jobs=1)
+        for jobs, pipeline in ((1, False), (3, False), (1, True), (2, True)):
+            with self.subTest(jobs=jobs, pipeline=pipeline):
+                outputs, log = self.build(f"memo{jobs}{pipeline}", jobs=jobs, pipeline=pipeline, memo=BlockMemo())
+                self.assertEqual(outputs, serial_outputs)
+                log, summary = log.rstrip("\n").rsplit("\n", 1)
+                self.assertEqual(log + "\n", serial_log)
+                # Every post repeats the same list block.
+                self.assertRegex(summary, r"^Block memo: \d+ hits, \d+ misses")
+                self.assertNotIn(" 0 hits", summary)
+
+    def test_direct_output_matches_serial(self):
+        serial_outputs, serial_log = self.build("serial", jobs=1)
+        for jobs, pipeline in ((1, False), (3, False), (2, True)):
+            with self.subTest(jobs=jobs, pipeline=pipeline):
+                outputs, log = self.build(f"direct{jobs}{pipeline}", jobs=jobs, pipeline=pipeline, direct=True)
+                self.assertEqual(outputs, serial_outputs)
+                self.assertEqual(log, serial_log)
+
+    def test_parallel_reports_errors(self):
+        outputs, log = self.build("parallel", jobs=3)
+        self.assertNotIn("broken.html", outputs)
+        self.assertIn("Error parsing Markdown file at", log)
+        self.assertIn("no heading detected", log)
+
+class TestParseArgs(unittest.TestCase):
+    def test_watch_and_daemon_reject_options_they_ignore(self):
+        for mode in ("--watch", "--daemon"):
+            for option in (["--fingerprint"], ["--image-hints"], ["--search-index"], ["--precompress"],
+                           ["--direct"], ["--jobs", "4"]):
+                with self.subTest(mode=mode, option=option):
+                    stderr = io.StringIO()
+                    with redirect_stderr(stderr), self.assertRaises(SystemExit):
+                        parse_args([mode, *option])
+                    self.assertIn(f"{mode} cannot be combined with {option[0]}", stderr.getvalue())
+            self.assertEqual(parse_args([mode, "/site/", "--output", "out"]).output, "out")
+
+class TestFullBuild(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.docs = os.path.join(self.root, "docs")
+        self.write("template.html", '<link href="/index.css"><title>{{ Title }}</title>{{ Content }}')
+        self.write(os.path.join("static", "index.css"), "body {}")
+        self.write(os.path.join("content", "index.md"), "# Home\n\nWelcome")
+        self.write(os.path.join("content", "blog", "post.md"), "# Post\n\nHello")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, rel_path, text):
+        path = os.path.join(self.root, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            f.write(text)
+
+    def run_main(self, *args):
+        subprocess.run([sys.executable, MAIN, *args], cwd=self.root, check=True, stdout=subprocess.DEVNULL)
+
+    def test_rebuild_leaves_unchanged_outputs_alone(self):
+        self.run_main()
+        paths = [os.path.join(self.docs, name) for name in ("index.html", "index.css", "blog/post.html")]
+        stamps = [os.stat(path).st_mtime_ns for path in paths]
+
+        self.run_main()
+        self.assertEqual([os.stat(path).st_mtime_ns for path in paths], stamps)
+
+    def test_rebuild_removes_outputs_it_no_longer_writes(self):
+        self.run_main()
+        self.write(os.path.join("docs", "stray", "old.html"), "old")
+        os.remove(os.path.join(self.root, "content", "blog", "post.md"))
+
+        self.run_main()
+        self.assertEqual(sorted(os.listdir(self.docs)), ["index.css", "index.html"])
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
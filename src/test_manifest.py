@@ -0,0 +1,154 @@
+import io
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+from htmlnode import markdown_to_html_node
+from main import BuildOptions, generate_pages_recursive
+from manifest import MANIFEST_DIR, MANIFEST_PATH, BuildManifest, GENERATOR_VERSION, hash_bytes, manifest_path
+
+TEMPLATE = "<title>{{ Title }}</title><article>{{ Content }}</article>"
+
+# If these samples render differently, pages built by the previous generator
+# are stale: bump GENERATOR_VERSION and record the new digest under it.
+VERSION_SAMPLES = [
+    "# Title\n\nSome **bold**, _italic_ and `code`.",
+    "```\nfirst\n\nsecond\n```",
+    "A [link](/blog) and ![img](/a.png)",
+    "> quoted\n> more",
+    "- one\n- two\n\n1. one\n2. two",
+    "    indented",
+    "```\nx = 1\n\nprint(x)  # then close: ```\n\nmore",
+]
+VERSION_DIGESTS = {"4": "84a829ef854acef4a6c817a19deee8e4d1600e369a00414c731c0c7a654a2af7"}
+
+class TestBuildManifest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.content = os.path.join(self.root, "content")
+        self.dest = os.path.join(self.root, "docs")
+        self.template = os.path.join(self.root, "template.html")
+        self.manifest_path = os.path.join(self.root, "cache", "manifest.json")
+        os.makedirs(os.path.join(self.content, "blog"))
+        self.write(self.template, TEMPLATE)
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nWelcome")
+        self.write(os.path.join(self.content, "blog", "post.md"), "# Post\n\nHello")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, path, text):
+        with open(path, 'w') as f:
+            f.write(text)
+
+    def build(self, base_path="/", dest=None, path=None):
+        manifest = BuildManifest(path or self.manifest_path)
+        log = io.StringIO()
+        with redirect_stdout(log):
+            generate_pages_recursive(self.content, self.template, dest or self.dest, base_path,
+                                     BuildOptions(manifest=manifest))
+            manifest.remove_stale()
+        manifest.save()
+        self.log = log.getvalue()
+        return manifest
+
+    def test_entry_records_inputs(self):
+        manifest = BuildManifest(self.manifest_path)
+        entry = manifest.page_entry(os.path.join(self.content, "index.md"), self.template, "/base/")
+        self.assertEqual(entry["base_path"], "/base/")
+        self.assertEqual(entry["generator_version"], GENERATOR_VERSION)
+        self.assertEqual(len(entry["source_hash"]), 64)
+
+    def test_generator_version_matches_output(self):
+        html = "".join(markdown_to_html_node(markdown).to_html("/site/") for markdown in VERSION_SAMPLES)
+        self.assertEqual(hash_bytes(html.encode()), VERSION_DIGESTS.get(GENERATOR_VERSION))
+
+    def test_second_build_skips_unchanged_pages(self):
+        self.build()
+        manifest = self.build()
+        self.assertEqual(self.log.count("Unchanged, skipping"), 2)
+        self.assertNotIn("Generating page", self.log)
+        self.assertEqual(len(manifest.outputs), 2)
+
+    def test_output_rewritten_by_a_full_build_is_regenerated(self):
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\n[Blog](/blog)")
+        self.build()
+        index_html = os.path.join(self.dest, "index.html")
+        with redirect_stdout(io.StringIO()):
+            generate_pages_recursive(self.content, self.template, self.dest, "/site/")
+
+        self.build()
+        self.assertIn(f"Generating page from {os.path.join(self.content, 'index.md')}", self.log)
+        self.assertIn("Unchanged, skipping", self.log)
+        with open(index_html) as f:
+            self.assertIn('href="/blog"', f.read())
+
+    def test_changed_source_is_regenerated(self):
+        self.build()
+        post_html = os.path.join(self.dest, "blog", "post.html")
+        os.utime(post_html, (0, 0))
+        self.write(os.path.join(self.content, "blog", "post.md"), "# Post\n\nUpdated")
+
+        self.build()
+        self.assertNotEqual(os.stat(post_html).st_mtime, 0)
+        with open(post_html) as f:
+            self.assertIn("Updated", f.read())
+
+    def test_template_or_base_path_change_regenerates(self):
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\n[Blog](/blog)")
+        self.build()
+        index_html = os.path.join(self.dest, "index.html")
+        os.utime(index_html, (0, 0))
+        self.build(base_path="/site/")
+        self.assertNotEqual(os.stat(index_html).st_mtime, 0)
+
+        os.utime(index_html, (0, 0))
+        self.write(self.template, TEMPLATE + "<footer></footer>")
+        self.build(base_path="/site/")
+        self.assertNotEqual(os.stat(index_html).st_mtime, 0)
+
+    def test_missing_output_is_regenerated(self):
+        self.build()
+        index_html = os.path.join(self.dest, "index.html")
+        os.remove(index_html)
+        self.build()
+        self.assertTrue(os.path.isfile(index_html))
+
+    def test_deleted_source_removes_output(self):
+        self.build()
+        os.remove(os.path.join(self.content, "blog", "post.md"))
+
+        manifest = self.build()
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "blog", "post.html")))
+        self.assertEqual(list(manifest.outputs), [os.path.join(self.dest, "index.html")])
+
+    def test_manifest_path_per_output_dir(self):
+        self.assertEqual(manifest_path("docs"), MANIFEST_PATH)
+        self.assertEqual(manifest_path(os.path.abspath("docs")), MANIFEST_PATH)
+        self.assertNotEqual(manifest_path("a"), manifest_path("b"))
+        self.assertTrue(manifest_path(self.dest).startswith(os.path.join(MANIFEST_DIR, "_")))
+        self.assertNotEqual(manifest_path(self.dest), manifest_path(self.root))
+
+    def test_builds_into_other_output_dirs_keep_each_others_outputs(self):
+        cwd = os.getcwd()
+        os.chdir(self.root)
+        self.addCleanup(os.chdir, cwd)
+
+        self.build(dest="a", path=manifest_path("a"))
+        self.build(dest="b", path=manifest_path("b"))
+        self.assertNotIn("Removed stale output", self.log)
+        self.assertTrue(os.path.isfile(os.path.join("a", "index.html")))
+
+        self.build(dest="a", path=manifest_path("a"))
+        self.assertEqual(self.log.count("Unchanged, skipping"), 2)
+
+    def test_corrupt_manifest_is_ignored(self):
+        os.makedirs(os.path.dirname(self.manifest_path))
+        self.write(self.manifest_path, "{not json")
+        manifest = BuildManifest(self.manifest_path)
+        self.assertEqual(manifest.previous, {})
+
+if __name__ == "__main__":
+    unittest.main()
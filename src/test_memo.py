@@ -0,0 +1,74 @@
+import unittest
+from unittest import mock
+
+import memo
+from htmlnode import markdown_to_html_node
+from memo import BlockMemo, MemoStats
+from textnode import BlockType
+
+MARKDOWN = """# Title
+
+Some **bold** and a [link](/blog) with ![img](/a.png)
+
+```
+code
+
+more code
+```
+
+> quoted
+
+1. one
+2. two
+"""
+
+class TestBlockMemo(unittest.TestCase):
+    def test_render_matches_node_tree(self):
+        self.assertEqual(BlockMemo().render(MARKDOWN), markdown_to_html_node(MARKDOWN).to_html())
+
+    def test_repeated_block_is_a_hit(self):
+        block_memo = BlockMemo()
+        first = block_memo.fragment("Some **bold**", BlockType.paragraph)
+        with mock.patch.object(memo, "create_blocknode") as create:
+            second = block_memo.fragment("Some **bold**", BlockType.paragraph)
+        create.assert_not_called()
+        self.assertEqual(second, first)
+        self.assertEqual((block_memo.hits, block_memo.misses), (1, 1))
+
+    def test_key_includes_block_type(self):
+        block_memo = BlockMemo()
+        self.assertEqual(block_memo.fragment("# x", BlockType.heading), "<h1>x</h1>")
+        self.assertEqual(block_memo.fragment("# x", BlockType.paragraph), "<p># x</p>")
+        self.assertEqual(block_memo.misses, 2)
+
+    def test_evicts_least_recently_used(self):
+        block_memo = BlockMemo(max_bytes=40)
+        block_memo.fragment("aaaa", BlockType.paragraph)
+        block_memo.fragment("bbbb", BlockType.paragraph)
+        block_memo.fragment("aaaa", BlockType.paragraph)
+        block_memo.fragment("cccc", BlockType.paragraph)
+        self.assertEqual(list(block_memo.fragments), [(BlockType.paragraph, "aaaa", "/", None, None), (BlockType.paragraph, "cccc", "/", None, None)])
+        self.assertLessEqual(block_memo.size, 40)
+
+    def test_oversized_fragment_is_not_kept(self):
+        block_memo = BlockMemo(max_bytes=10)
+        self.assertEqual(block_memo.fragment("a long paragraph", BlockType.paragraph), "<p>a long paragraph</p>")
+        self.assertEqual(len(block_memo.fragments), 0)
+        self.assertEqual(block_memo.size, 0)
+
+class TestMemoStats(unittest.TestCase):
+    def test_latest_report_per_process_wins(self):
+        stats = MemoStats()
+        stats.add((1, 1, 2))
+        stats.add((1, 3, 2))
+        stats.add((2, 0, 4))
+        stats.add(None)
+        self.assertEqual(stats.totals(), (3, 6))
+        self.assertEqual(stats.summary(),
+                         "Block memo: 3 hits, 6 misses (33.3% hit rate, one memo in each of 2 processes)")
+
+    def test_empty_summary(self):
+        self.assertEqual(MemoStats().summary(), "Block memo: 0 hits, 0 misses (0.0% hit rate)")
+
+if __name__ == "__main__":
+    unittest.main()
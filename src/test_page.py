@@ -0,0 +1,60 @@
+import os
+import tempfile
+import unittest
+from page import extract_title, write_page
+from template import Template
+
+class TestExtractTitle(unittest.TestCase):
+    
+    def test_simple_title(self):
+        markdown = "# Hello World"
+        self.assertEqual(extract_title(markdown), "Hello World")
+    
+    def test_title_with_spaces(self):
+        markdown = "#    Lots of Spaces    "
+        self.assertEqual(extract_title(markdown), "Lots of Spaces")
+    
+    def test_multiline_markdown(self):
+        markdown = "# The Title\n\nThis is some content.\n\n## Subtitle"
+        self.assertEqual(extract_title(markdown), "The Title")
+    
+    def test_no_title(self):
+        markdown = "This is just text without a title"
+        with self.assertRaises(Exception):
+            extract_title(markdown)
+    
+    def test_title_not_at_beginning(self):
+        markdown = "Some text\n# Title"
+        with self.assertRaises(Exception):
+            extract_title(markdown)
+
+class TestWritePage(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.template = Template(["<p>", "</p>"], ["Content"])
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_creates_missing_directories(self):
+        dest_path = os.path.join(self.tmp.name, "a", "b", "page.html")
+        self.assertEqual(write_page(dest_path, self.template, {"Content": "hi"}), 9)
+        with open(dest_path) as f:
+            self.assertEqual(f.read(), "<p>hi</p>")
+        self.assertEqual(os.listdir(os.path.dirname(dest_path)), ["page.html"])
+
+    def test_identical_page_is_not_rewritten(self):
+        dest_path = os.path.join(self.tmp.name, "page.html")
+        write_page(dest_path, self.template, {"Content": "hi"})
+        os.utime(dest_path, (0, 0))
+        self.assertEqual(write_page(dest_path, self.template, {"Content": "hi"}), 0)
+        self.assertEqual(os.stat(dest_path).st_mtime, 0)
+
+        self.assertEqual(write_page(dest_path, self.template, {"Content": "ho"}), 9)
+        self.assertNotEqual(os.stat(dest_path).st_mtime, 0)
+        with open(dest_path) as f:
+            self.assertEqual(f.read(), "<p>ho</p>")
+        self.assertEqual(os.listdir(self.tmp.name), ["page.html"])
+
+if __name__ == "__main__":
+    unittest.main()
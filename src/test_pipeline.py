@@ -0,0 +1,44 @@
+import os
+import tempfile
+import unittest
+
+from pipeline import run_pipeline
+from template import compile_template
+
+class TestPipeline(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.template = compile_template("<title>{{ Title }}</title>{{ Content }}")
+        self.sources = []
+        self.dests = []
+        for i in range(20):
+            source = os.path.join(self.tmp.name, "content", f"page{i}.md")
+            os.makedirs(os.path.dirname(source), exist_ok=True)
+            with open(source, 'w') as f:
+                f.write(f"# Page {i}\n\nBody {i}" if i != 5 else "no title")
+            self.sources.append(source)
+            self.dests.append(os.path.join(self.tmp.name, "docs", f"page{i}.html"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_small_queues(self):
+        errors = run_pipeline(self.sources, self.template, self.dests, io_workers=2, queue_size=1)
+        self.assertEqual(errors[5], "no heading detected")
+        self.assertEqual([error for error in errors if error is not None], ["no heading detected"])
+        with open(self.dests[7]) as f:
+            self.assertEqual(f.read(), "<title>Page 7</title><div><h1>Page 7</h1><p>Body 7</p></div>")
+        self.assertFalse(os.path.exists(self.dests[5]))
+
+    def test_profiling_results(self):
+        results = run_pipeline(self.sources, self.template, self.dests, profiling=True)
+        error, timings = results[0]
+        self.assertIsNone(error)
+        self.assertEqual(sorted(timings), ["parse", "read", "render", "template", "write"])
+        self.assertEqual(timings["write"]["bytes"], os.path.getsize(self.dests[0]))
+
+    def test_no_pages(self):
+        self.assertEqual(run_pipeline([], self.template, []), [])
+
+if __name__ == "__main__":
+    unittest.main()
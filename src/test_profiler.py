@@ -0,0 +1,88 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+from main import BuildOptions, copy_static, generate_pages_recursive
+from profiler import BuildProfile, StageClock, section
+
+class TestProfiler(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = self.tmp.name
+        self.content = os.path.join(root, "content")
+        self.static = os.path.join(root, "static")
+        self.template = os.path.join(root, "template.html")
+        self.dest = os.path.join(root, "docs")
+        os.makedirs(self.content)
+        os.makedirs(self.static)
+        with open(self.template, 'w') as f:
+            f.write("<title>{{ Title }}</title>{{ Content }}")
+        with open(os.path.join(self.static, "index.css"), 'w') as f:
+            f.write("body {}")
+        for name in ("a", "b"):
+            with open(os.path.join(self.content, f"{name}.md"), 'w') as f:
+                f.write(f"# Page {name}\n\nSome **text**")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def build(self, jobs=1):
+        profile = BuildProfile()
+        with redirect_stdout(io.StringIO()), profile:
+            copy_static(self.static, self.dest, profile)
+            generate_pages_recursive(self.content, self.template, self.dest, "/",
+                                     BuildOptions(jobs=jobs, profile=profile))
+        return profile
+
+    def test_page_stages(self):
+        profile = self.build()
+        page = profile.pages[os.path.join(self.content, "a.md")]
+        self.assertEqual(sorted(page), ["parse", "read", "render", "template", "write"])
+        self.assertEqual(page["read"]["bytes"], len("# Page a\n\nSome **text**"))
+        self.assertEqual(page["write"]["bytes"], os.path.getsize(os.path.join(self.dest, "a.html")))
+
+    def test_parallel_pages_are_profiled(self):
+        profile = self.build(jobs=2)
+        self.assertEqual(len(profile.pages), 2)
+
+    def test_static_files(self):
+        profile = self.build()
+        self.assertEqual(profile.files[os.path.join(self.dest, "index.css")]["bytes"], 7)
+        self.assertEqual(profile.stage_totals()["copy_static"]["bytes"], 7)
+
+    def test_report_and_summary(self):
+        profile = self.build()
+        path = os.path.join(self.tmp.name, "out", "profile.json")
+        profile.save(path)
+        with open(path) as f:
+            report = json.load(f)
+
+        self.assertEqual(sorted(report), ["files", "pages", "sections", "stages", "total_seconds"])
+        self.assertIn("parse", report["stages"])
+        summary = profile.summary(limit=1)
+        self.assertIn("Slowest stages:", summary)
+        self.assertEqual(len(summary.splitlines()), 4)
+
+    def test_section_inside_page(self):
+        timings = {}
+        with StageClock(timings):
+            with section("minify", nbytes=10):
+                pass
+        self.assertEqual(timings["minify"]["bytes"], 10)
+
+    def test_section_outside_page(self):
+        with BuildProfile() as profile:
+            with section("sitemap"):
+                pass
+        self.assertIn("sitemap", profile.sections)
+        self.assertIn("sitemap", profile.stage_totals())
+
+    def test_section_without_profile(self):
+        with section("ignored"):
+            pass
+
+if __name__ == "__main__":
+    unittest.main()
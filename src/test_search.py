@@ -0,0 +1,135 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+
+import page
+from main import BuildOptions, generate_pages_recursive
+from manifest import BuildManifest
+from corpus import generate_corpus
+from htmlnode import markdown_to_html_node
+from search import SearchIndex, delta_encode, page_terms, page_url, shard_name, tree_terms
+
+class TestSearchTerms(unittest.TestCase):
+    def test_page_terms_skip_urls_and_markup(self):
+        terms = page_terms("# The Title\n\nSome **bold** [link text](/blog/post) and ![alt](/a.png)\n\n- the item")
+        self.assertEqual(terms["the"], 2)
+        self.assertEqual(terms["bold"], 1)
+        self.assertEqual(terms["link"], 1)
+        self.assertNotIn("blog", terms)
+        self.assertNotIn("png", terms)
+
+    def test_code_blocks_are_indexed_verbatim(self):
+        terms = page_terms("```\nprint(value)\n```")
+        self.assertEqual(terms["print"], 1)
+        self.assertEqual(terms["value"], 1)
+
+    def test_tree_terms_match_page_terms(self):
+        with tempfile.TemporaryDirectory() as root:
+            generate_corpus(root, pages=20, static_files=0, seed=3)
+            for dir_path, dirs, files in os.walk(root):
+                for name in files:
+                    with open(os.path.join(dir_path, name)) as f:
+                        markdown = f.read()
+                    self.assertEqual(tree_terms(markdown_to_html_node(markdown)), page_terms(markdown))
+
+    def test_delta_encode(self):
+        self.assertEqual(delta_encode([0, 3, 4, 10]), [0, 3, 1, 6])
+        self.assertEqual(delta_encode([]), [])
+
+    def test_shard_name(self):
+        self.assertEqual(shard_name("tolkien"), "to")
+        self.assertEqual(shard_name("a"), "a")
+        self.assertEqual(shard_name("élan"), "_" + "él".encode().hex())
+
+    def test_page_url(self):
+        self.assertEqual(page_url("docs/index.html", "docs", "/"), "/")
+        self.assertEqual(page_url("docs/blog/tom/index.html", "docs", "/site/"), "/site/blog/tom/")
+        self.assertEqual(page_url("docs/about.html", "docs", "/"), "/about.html")
+
+class TestSearchIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.content = os.path.join(self.root, "content")
+        self.dest = os.path.join(self.root, "docs")
+        self.template = os.path.join(self.root, "template.html")
+        self.cache_path = os.path.join(self.root, "cache", "search.json")
+        self.manifest_path = os.path.join(self.root, "cache", "manifest.json")
+        self.sources = {}
+        for name, text in (("a", "# Apple\n\napple tart"), ("b", "# Banana\n\napple banana banana")):
+            path = os.path.join(self.content, name, "index.md")
+            self.write(path, text)
+            self.sources[name] = path
+        self.write(self.template, "<title>{{ Title }}</title>{{ Content }}")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, path, text):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            f.write(text)
+
+    def build(self, incremental=False, **options):
+        index = SearchIndex(self.dest, "/", self.cache_path)
+        manifest = BuildManifest(self.manifest_path) if incremental else None
+        self.log = io.StringIO()
+        with redirect_stdout(self.log):
+            generate_pages_recursive(self.content, self.template, self.dest, "/",
+                                     BuildOptions(manifest=manifest, search=index, **options))
+            written = index.write()
+        index.save()
+        if manifest is not None:
+            manifest.save()
+        return index, written
+
+    def read(self, name):
+        with open(os.path.join(self.dest, "search", name + ".json")) as f:
+            return json.load(f)
+
+    def read_all(self):
+        return {name: self.read(name[:-len(".json")]) for name in os.listdir(os.path.join(self.dest, "search"))}
+
+    def test_writes_docs_and_sharded_postings(self):
+        index, written = self.build()
+        self.assertEqual(self.read("docs"), [["/a/", "Apple"], ["/b/", "Banana"]])
+        self.assertEqual(self.read("ap")["apple"], [[0, 1], [2, 1]])
+        self.assertEqual(self.read("ba")["banana"], [[1], [3]])
+        self.assertNotIn("banana", self.read("ap"))
+        self.assertEqual(len(written), 1 + len({shard_name(term) for term in ("apple", "tart", "banana")}))
+
+    def test_parallel_and_pipeline_builds_match_serial(self):
+        self.build()
+        serial = self.read_all()
+        for options in ({"jobs": 2}, {"pipeline": True}, {"stream_threshold": 1}, {"direct": True}):
+            with self.subTest(**options):
+                self.build(**options)
+                self.assertEqual(self.read_all(), serial)
+
+    def test_unchanged_pages_are_not_reindexed(self):
+        self.build(incremental=True)
+        self.write(self.sources["b"], "# Cherry\n\ncherry")
+
+        with mock.patch.object(page, "tree_terms", wraps=page.tree_terms) as terms, \
+                mock.patch.object(page, "page_terms") as rescan:
+            index, written = self.build(incremental=True)
+        self.assertEqual(terms.call_count, 1)
+        rescan.assert_not_called()
+        self.assertEqual(index.indexed, 1)
+        self.assertEqual(self.read("ch")["cherry"], [[1], [2]])
+        self.assertNotIn(os.path.join(self.dest, "search", "ba.json"), written)
+
+    def test_skipped_page_without_cached_terms_is_rendered(self):
+        self.build(incremental=True)
+        os.remove(self.cache_path)
+        index, written = self.build(incremental=True)
+        self.assertNotIn("Unchanged, skipping", self.log.getvalue())
+        self.assertEqual(index.indexed, 2)
+        self.assertEqual(self.read("ap")["apple"], [[0, 1], [2, 1]])
+
+if __name__ == "__main__":
+    unittest.main()
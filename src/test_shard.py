@@ -0,0 +1,151 @@
+import argparse
+import filecmp
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from shard import SHARD_MANIFEST_NAME, assign_shards, merge_shards, parse_shard, select_shard, write_shard_manifest
+
+MAIN = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+
+class TestShardSplit(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.pages = []
+        for i, size in enumerate([50, 10, 40, 30, 20, 20, 5]):
+            path = os.path.join(self.tmp.name, f"page{i}.md")
+            with open(path, 'w') as f:
+                f.write("x" * size)
+            self.pages.append((path, f"docs/page{i}.html"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_parse_shard(self):
+        self.assertEqual(parse_shard("2/3"), (2, 3))
+        for text in ("0/3", "4/3", "x/3", "3"):
+            with self.assertRaises(argparse.ArgumentTypeError):
+                parse_shard(text)
+
+    def test_every_page_in_exactly_one_shard(self):
+        shards = assign_shards(self.pages, 3)
+        self.assertEqual(sorted(page for shard in shards for page in shard), sorted(self.pages))
+
+    def test_balanced_by_size(self):
+        totals = [sum(os.path.getsize(page[0]) for page in shard) for shard in assign_shards(self.pages, 3)]
+        self.assertEqual(sorted(totals), [55, 60, 60])
+
+    def test_split_ignores_discovery_order(self):
+        self.assertEqual(
+            [sorted(shard) for shard in assign_shards(self.pages, 3)],
+            [sorted(shard) for shard in assign_shards(list(reversed(self.pages)), 3)]
+        )
+
+    def test_select_keeps_discovery_order(self):
+        selected = select_shard(self.pages, (1, 2))
+        self.assertEqual(selected, [page for page in self.pages if page in selected])
+
+class TestMergeShards(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def make_shard(self, index, count, files):
+        shard_dir = os.path.join(self.root, f"shard{index}")
+        for rel_path, text in files.items():
+            path = os.path.join(shard_dir, rel_path)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'w') as f:
+                f.write(text)
+        os.makedirs(shard_dir, exist_ok=True)
+        write_shard_manifest(shard_dir, (index, count))
+        return shard_dir
+
+    def merge(self, shard_dirs):
+        dest = os.path.join(self.root, "docs")
+        merge_shards(shard_dirs, dest, os.path.join(self.root, "shards.json"))
+        return dest
+
+    def test_merges_outputs_without_shard_manifests(self):
+        shards = [
+            self.make_shard(1, 2, {"index.html": "a", "index.css": "css"}),
+            self.make_shard(2, 2, {"blog/post.html": "b", "index.css": "css"}),
+        ]
+        dest = self.merge(shards)
+        self.assertFalse(os.path.exists(os.path.join(dest, SHARD_MANIFEST_NAME)))
+        with open(os.path.join(dest, "blog", "post.html")) as f:
+            self.assertEqual(f.read(), "b")
+        with open(os.path.join(self.root, "shards.json")) as f:
+            self.assertEqual(sorted(json.load(f)["outputs"]), ["blog/post.html", "index.css", "index.html"])
+
+    def test_conflicting_outputs(self):
+        shards = [self.make_shard(1, 2, {"index.html": "a"}), self.make_shard(2, 2, {"index.html": "b"})]
+        with self.assertRaisesRegex(ValueError, "conflicting outputs: index.html"):
+            self.merge(shards)
+
+    def test_missing_shard(self):
+        shards = [self.make_shard(1, 3, {"a.html": "a"}), self.make_shard(3, 3, {"c.html": "c"})]
+        with self.assertRaisesRegex(ValueError, r"expected shards 1 to 3, got \[1, 3\]"):
+            self.merge(shards)
+
+    def test_shard_dir_as_destination(self):
+        shards = [self.make_shard(1, 2, {"index.html": "a"}), self.make_shard(2, 2, {"post.html": "b"})]
+        for dest in (shards[1], self.root, os.path.join(shards[0], "docs")):
+            with self.assertRaisesRegex(ValueError, "overlaps it"):
+                merge_shards(shards, dest, os.path.join(self.root, "shards.json"))
+        self.assertTrue(os.path.isfile(os.path.join(shards[1], "post.html")))
+
+    def test_files_changed_after_shard_build(self):
+        shard_dir = self.make_shard(1, 1, {"index.html": "a"})
+        with open(os.path.join(shard_dir, "extra.html"), 'w') as f:
+            f.write("x")
+        with self.assertRaisesRegex(ValueError, "does not match its shard manifest: extra.html"):
+            self.merge([shard_dir])
+
+class TestShardedBuild(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        with open(os.path.join(self.root, "template.html"), 'w') as f:
+            f.write('<link href="/index.css"><title>{{ Title }}</title>{{ Content }}')
+        os.makedirs(os.path.join(self.root, "static"))
+        with open(os.path.join(self.root, "static", "index.css"), 'w') as f:
+            f.write("body {}")
+        for i in range(7):
+            page_dir = os.path.join(self.root, "content", "blog", f"post{i}")
+            os.makedirs(page_dir)
+            with open(os.path.join(page_dir, "index.md"), 'w') as f:
+                f.write(f"# Post {i}\n\n" + "Some [text](/blog). " * (i + 1))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def run_main(self, *args):
+        subprocess.run([sys.executable, MAIN, *args], cwd=self.root, check=True, stdout=subprocess.DEVNULL)
+
+    def test_merged_shards_match_full_build(self):
+        # The shards run at once and share .build-cache, as they do on one machine.
+        self.run_main("/site/", "--image-hints", "--output", "full")
+        shards = [subprocess.Popen([sys.executable, MAIN, "/site/", "--image-hints", "--shard", f"{i}/3",
+                                    "--output", f"shard{i}"], cwd=self.root, stdout=subprocess.DEVNULL)
+                  for i in (1, 2, 3)]
+        for process in shards:
+            self.assertEqual(process.wait(), 0)
+        self.run_main("--merge", "shard1", "shard2", "shard3", "--output", "merged")
+
+        full = os.path.join(self.root, "full")
+        merged = os.path.join(self.root, "merged")
+        for root, dirs, files in os.walk(full):
+            for name in files:
+                path = os.path.join(root, name)
+                self.assertTrue(filecmp.cmp(path, os.path.join(merged, os.path.relpath(path, full)), shallow=False))
+        self.assertEqual(sum(len(files) for root, dirs, files in os.walk(merged)), 8)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+import io
+import os
+import tempfile
+import tracemalloc
+import unittest
+from contextlib import redirect_stdout
+
+from main import BuildOptions, generate_pages_recursive
+from page import build_page
+from stream import build_streamed_page, iter_block_sources
+from template import compile_template
+
+MARKDOWN = """# Changelog
+
+Intro with a [link](/blog) and ![img](/images/a.png)
+
+```
+def f():
+
+    return 1
+```
+
+    indented paragraph
+
+> quoted
+> text
+
+- one
+- two
+
+1. first
+2. second
+
+```
+never closed
+
+tail"""
+
+class TestStream(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.template = compile_template('<title>{{ Title }}</title><link href="/index.css">{{ Content }}', "/site/")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def write(self, name, data):
+        with open(self.path(name), 'wb') as f:
+            f.write(data.encode())
+        return self.path(name)
+
+    def read(self, name):
+        with open(self.path(name), 'rb') as f:
+            return f.read()
+
+    def test_block_sources_match_blank_line_splits(self):
+        sources = list(iter_block_sources(b"a\n\n\n\nb\nc\n\n```\nx\n\ny\n```\nz\n\n  \n\nlast"))
+        self.assertEqual(sources, ["a", "b\nc", "```\nx\n\ny\n```\nz", "last"])
+
+    def test_unclosed_fence_ignores_later_lines_ending_in_a_fence(self):
+        sources = list(iter_block_sources(b"```\nx = 1\n\nprint(x)  # then close: ```\n\nmore"))
+        self.assertEqual(sources, ["```\nx = 1", "print(x)  # then close: ```", "more"])
+
+    def test_matches_regular_build(self):
+        source = self.write("page.md", MARKDOWN)
+        self.assertIsNone(build_page(source, self.template, self.path("regular.html")))
+        self.assertIsNone(build_streamed_page(source, self.template, self.path("streamed.html")))
+        self.assertEqual(self.read("streamed.html"), self.read("regular.html"))
+
+    def test_direct_matches_regular_build(self):
+        source = self.write("page.md", MARKDOWN)
+        build_page(source, self.template, self.path("regular.html"))
+        self.assertIsNone(build_streamed_page(source, self.template, self.path("direct.html"), direct=True))
+        self.assertEqual(self.read("direct.html"), self.read("regular.html"))
+
+    def test_crlf_falls_back_to_regular_build(self):
+        source = self.write("page.md", MARKDOWN.replace("\n", "\r\n"))
+        build_page(source, self.template, self.path("regular.html"))
+        build_streamed_page(source, self.template, self.path("streamed.html"))
+        self.assertEqual(self.read("streamed.html"), self.read("regular.html"))
+
+    def test_missing_title(self):
+        source = self.write("page.md", "no title\n\ntext")
+        self.assertEqual(build_streamed_page(source, self.template, self.path("out.html")), "no heading detected")
+        self.assertFalse(os.path.exists(self.path("out.html")))
+        self.assertFalse(os.path.exists(self.path("out.html.tmp")))
+
+    def test_empty_file(self):
+        source = self.write("page.md", "")
+        self.assertEqual(build_streamed_page(source, self.template, self.path("out.html")), "no heading detected")
+
+    def test_memory_stays_bounded(self):
+        block = "Some **bold** text and a [link](/x) in a paragraph.\n\n"
+        source = self.write("big.md", "# Big\n\n" + block * 12000)
+        tracemalloc.start()
+        build_streamed_page(source, self.template, self.path("big.html"))
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        self.assertGreater(os.path.getsize(source), 512 * 1024)
+        self.assertLess(peak, 128 * 1024)
+
+    def test_threshold_routes_large_pages(self):
+        content = self.path("content")
+        os.makedirs(content)
+        for name, text in (("a.md", "# A\n\nsmall"), ("b.md", MARKDOWN), ("c.md", "# C\n\nsmall")):
+            with open(os.path.join(content, name), 'w') as f:
+                f.write(text)
+        template_path = self.write("template.html", "<title>{{ Title }}</title>{{ Content }}")
+
+        for name, threshold in (("regular", None), ("streamed", 100)):
+            with redirect_stdout(io.StringIO()):
+                generate_pages_recursive(content, template_path, self.path(name), "/",
+                                         BuildOptions(stream_threshold=threshold))
+        for page in ("a.html", "b.html", "c.html"):
+            self.assertEqual(self.read(os.path.join("streamed", page)), self.read(os.path.join("regular", page)))
+
+if __name__ == "__main__":
+    unittest.main()
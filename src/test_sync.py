@@ -0,0 +1,106 @@
+import io
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+from manifest import BuildManifest
+from sync import copy_file, files_match, sync_static
+
+class TestSyncStatic(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.static = os.path.join(self.tmp.name, "static")
+        self.dest = os.path.join(self.tmp.name, "docs")
+        os.makedirs(os.path.join(self.static, "images"))
+        self.write(os.path.join(self.static, "index.css"), "body { color: red; }")
+        self.write(os.path.join(self.static, "images", "a.png"), "not really a png")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, path, text):
+        with open(path, 'w') as f:
+            f.write(text)
+
+    def read(self, path):
+        with open(path) as f:
+            return f.read()
+
+    def sync(self, manifest=None, **kwargs):
+        with redirect_stdout(io.StringIO()):
+            return sync_static(self.static, self.dest, manifest, **kwargs)
+
+    def test_first_sync_copies_everything(self):
+        copied = self.sync()
+        self.assertEqual(sorted(copied), [
+            os.path.join(self.dest, "images", "a.png"),
+            os.path.join(self.dest, "index.css"),
+        ])
+        self.assertEqual(self.read(os.path.join(self.dest, "index.css")), "body { color: red; }")
+
+    def test_unchanged_files_are_not_rewritten(self):
+        self.sync()
+        self.assertEqual(self.sync(), [])
+
+    def test_changed_file_is_copied(self):
+        self.sync()
+        css = os.path.join(self.static, "index.css")
+        self.write(css, "body { color: blue; }")
+        os.utime(css, ns=(1, 1))
+
+        self.assertEqual(self.sync(), [os.path.join(self.dest, "index.css")])
+        self.assertEqual(self.read(os.path.join(self.dest, "index.css")), "body { color: blue; }")
+
+    def test_same_size_different_mtime(self):
+        self.sync()
+        css = os.path.join(self.static, "index.css")
+        os.utime(css, ns=(1, 1))
+        dest_css = os.path.join(self.dest, "index.css")
+
+        self.assertTrue(files_match(css, dest_css, use_hash=True))
+        self.assertFalse(files_match(css, dest_css))
+        self.assertEqual(self.sync(use_hash=True), [])
+
+    def test_pages_in_dest_are_kept(self):
+        self.sync()
+        page = os.path.join(self.dest, "index.html")
+        self.write(page, "<p>page</p>")
+        self.sync()
+        self.assertTrue(os.path.exists(page))
+
+    def test_orphaned_asset_is_removed_through_manifest(self):
+        manifest_path = os.path.join(self.tmp.name, "manifest.json")
+        manifest = BuildManifest(manifest_path)
+        self.sync(manifest)
+        manifest.save()
+
+        os.remove(os.path.join(self.static, "images", "a.png"))
+        manifest = BuildManifest(manifest_path)
+        self.sync(manifest)
+        with redirect_stdout(io.StringIO()):
+            removed = manifest.remove_stale()
+
+        self.assertEqual(removed, [os.path.join(self.dest, "images", "a.png")])
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "images")))
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "index.css")))
+
+    def test_hardlink(self):
+        self.sync(hardlink=True)
+        source = os.stat(os.path.join(self.static, "index.css"))
+        dest = os.stat(os.path.join(self.dest, "index.css"))
+        self.assertEqual(source.st_ino, dest.st_ino)
+        self.assertEqual(self.sync(hardlink=True), [])
+
+    def test_copy_replaces_hardlinked_output(self):
+        source = os.path.join(self.static, "index.css")
+        dest = os.path.join(self.tmp.name, "linked.css")
+        os.link(source, dest)
+
+        copy_file(source, dest)
+        self.assertNotEqual(os.stat(source).st_ino, os.stat(dest).st_ino)
+        self.assertEqual(self.read(dest), self.read(source))
+        self.assertEqual(os.stat(source).st_mtime_ns, os.stat(dest).st_mtime_ns)
+
+if __name__ == "__main__":
+    unittest.main()
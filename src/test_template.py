@@ -0,0 +1,83 @@
+import unittest
+
+from htmlnode import markdown_to_html_node
+from template import Template, compile_template, rewrite_links
+
+TEMPLATE = """<html>
+  <head>
+    <title>{{ Title }}</title>
+    <link href="/index.css" rel="stylesheet" />
+  </head>
+  <body>
+    <article>{{ Content }}</article>
+  </body>
+</html>"""
+
+class TestTemplate(unittest.TestCase):
+    def test_compile_splits_segments_and_slots(self):
+        template = compile_template("<title>{{ Title }}</title><p>{{ Content }}</p>")
+        self.assertEqual(template.slots, ["Title", "Content"])
+        self.assertEqual(template.segments, ["<title>", "</title><p>", "</p>"])
+
+    def test_compile_without_slots(self):
+        template = compile_template("<p>static</p>")
+        self.assertEqual(template.slots, [])
+        self.assertEqual(template.render({"Title": "x"}), "<p>static</p>")
+
+    def test_render_matches_replace(self):
+        values = {"Title": "Tolkien", "Content": "<p>Hello</p>"}
+        expected = TEMPLATE.replace("{{ Title }}", "Tolkien").replace("{{ Content }}", "<p>Hello</p>")
+        self.assertEqual(compile_template(TEMPLATE).render(values), expected)
+
+    def test_repeated_slot(self):
+        template = compile_template("{{ Title }} - {{ Title }}")
+        self.assertEqual(template.render({"Title": "A"}), "A - A")
+
+    def test_missing_slot_is_left_as_placeholder(self):
+        template = compile_template("<p>{{ Unknown }}</p>")
+        self.assertEqual(template.render({}), "<p>{{ Unknown }}</p>")
+
+    def test_base_path_applied_at_compile_time(self):
+        template = compile_template(TEMPLATE, "/site/")
+        rendered = template.render({"Title": "T", "Content": '<a href="/blog">x</a>'})
+        self.assertIn('<link href="/site/index.css"', rendered)
+        self.assertIn('<a href="/blog">', rendered)
+        self.assertEqual(template.base_path, "/site/")
+
+    def test_node_values_are_rendered_under_base_path(self):
+        template = compile_template(TEMPLATE, "/site/")
+        rendered = template.render({"Title": "T", "Content": markdown_to_html_node("[x](/blog)")})
+        self.assertIn('<a href="/site/blog">', rendered)
+
+    def test_write_matches_render(self):
+        class Sink:
+            def __init__(self):
+                self.chunks = []
+
+            def write(self, chunk):
+                self.chunks.append(chunk)
+
+        values = {"Title": "T", "Content": "C"}
+        template = compile_template(TEMPLATE)
+        sink = Sink()
+        template.write(sink, values)
+        self.assertEqual("".join(sink.chunks), template.render(values))
+
+    def test_rewrite_links(self):
+        html = '<a href="/a">a</a><img src="/b.png"><a href="https://x.org">x</a>'
+        self.assertEqual(
+            rewrite_links(html, "/site/"),
+            '<a href="/site/a">a</a><img src="/site/b.png"><a href="https://x.org">x</a>'
+        )
+        self.assertEqual(rewrite_links(html, "/"), html)
+
+    def test_mismatched_segments(self):
+        with self.assertRaises(ValueError):
+            Template(["a"], ["Title"])
+
+    def test_eq(self):
+        self.assertEqual(compile_template(TEMPLATE, "/x/"), compile_template(TEMPLATE, "/x/"))
+        self.assertNotEqual(compile_template(TEMPLATE, "/x/"), compile_template(TEMPLATE, "/y/"))
+
+if __name__ == "__main__":
+    unittest.main()
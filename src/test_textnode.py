@@ -10,8 +10,11 @@ from textnode import (
     split_nodes_image,
     split_nodes_link,
     text_to_textnodes,
+    tokenize_inline,
     markdown_to_blocks,
-    block_to_block_type
+    block_to_block_type,
+    scan_blocks,
+    BlockSpan
     )
 
 from htmlnode import text_node_to_html_node
@@ -38,6 +41,11 @@ class TestTextNode(unittest.TestCase):
         node2 = TextNode("This is a text node", TextType.LINK)
         self.assertNotEqual(node, node2)
 
+    def test_no_instance_dict(self):
+        node = TextNode("text", TextType.LINK, "/url")
+        self.assertFalse(hasattr(node, "__dict__"))
+        self.assertEqual(node, TextNode("text", TextType.LINK, "/url"))
+
     def test_text_node_to_html_node_text(self):
         text_node = TextNode("Hello, world!", TextType.TEXT)
     
@@ -499,6 +507,57 @@ class TestTextNode(unittest.TestCase):
         ]
         self.assertEqual(result, expected)
 
+class TestTokenizeInline(unittest.TestCase):
+    def split_chain(self, text):
+        nodes = [TextNode(text, TextType.TEXT)]
+        nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
+        nodes = split_nodes_delimiter(nodes, "*", TextType.ITALIC)
+        nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
+        nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
+        nodes = split_nodes_image(nodes)
+        nodes = split_nodes_link(nodes)
+        return [(node.text_type, node.text, node.url) for node in nodes]
+
+    def test_tokens(self):
+        self.assertEqual(list(tokenize_inline("a **b** [c](d)")), [
+            (TextType.TEXT, "a ", None),
+            (TextType.BOLD, "b", None),
+            (TextType.LINK, "c", "d"),
+        ])
+
+    def test_matches_split_chain(self):
+        cases = [
+            "plain text",
+            "**bold** and *italic* and _also italic_ and `code`",
+            "***both***",
+            "**a** **b**",
+            "*unclosed italic",
+            "`code with **stars** and _under_`",
+            "**bold with ![img](/a.png) inside**",
+            "`[not a link](x)` in code",
+            "a ![x](y)![z](w) b",
+            "![x](y)   [l](u)   ",
+            "!**[a](b)**",
+            "![a_b](c)",
+            "[a](b)[c](d) trailing",
+            "_x*y_z*",
+            "   ",
+            "",
+        ]
+        for text in cases:
+            with self.subTest(text=text):
+                self.assertEqual(list(tokenize_inline(text)), self.split_chain(text))
+
+    def test_many_links_and_images(self):
+        text = "see [link](/a) and ![img](/b.png) " * 5000
+        tokens = list(tokenize_inline(text))
+        self.assertEqual(len(tokens), 20001)
+        self.assertEqual(tokens[-1], (TextType.TEXT, " ", None))
+
+    def test_unbalanced_brackets(self):
+        text = "[a](" * 20000 + "[" * 20000
+        self.assertEqual(list(tokenize_inline(text)), [(TextType.TEXT, text, None)])
+
 class TestMarkdownToBlocks(unittest.TestCase):
     def test_markdown_to_blocks(self):
         md = """
@@ -594,6 +653,42 @@ class TestMarkdownToBlocks(unittest.TestCase):
             ],
         )     
 
+    def test_scan_blocks_spans(self):
+        md = "# Title\n\nSome *text*\nmore\n\n\n- a\n- b\n"
+        self.assertEqual(list(scan_blocks(md)), [
+            BlockSpan(0, 7, BlockType.heading),
+            BlockSpan(9, 25, BlockType.paragraph),
+            BlockSpan(28, 35, BlockType.unordered_list),
+        ])
+
+    def test_fenced_code_keeps_blank_lines(self):
+        md = "Intro\n\n```\nfirst()\n\n\nsecond()\n```\n\nOutro"
+        self.assertEqual(markdown_to_blocks(md), [
+            "Intro",
+            "```\nfirst()\n\n\nsecond()\n```",
+            "Outro",
+        ])
+        self.assertEqual(
+            [span.block_type for span in scan_blocks(md)],
+            [BlockType.paragraph, BlockType.code, BlockType.paragraph]
+        )
+
+    def test_fence_opening_followed_by_blank_line(self):
+        md = "```\n\ncode\n```"
+        self.assertEqual(markdown_to_blocks(md), ["```\n\ncode\n```"])
+
+    def test_unclosed_fence_splits_on_blank_lines(self):
+        md = "```\nnever closed\n\nnext"
+        self.assertEqual(markdown_to_blocks(md), ["```\nnever closed", "next"])
+
+    def test_unclosed_fence_ignores_later_lines_ending_in_a_fence(self):
+        md = "```\nx = 1\n\nprint(x)  # then close: ```\n\nmore"
+        self.assertEqual(markdown_to_blocks(md), ["```\nx = 1", "print(x)  # then close: ```", "more"])
+
+    def test_one_line_fence_is_not_extended(self):
+        md = "```code```\nline\n\nnext\n```"
+        self.assertEqual(markdown_to_blocks(md), ["```code```\nline", "next\n```"])
+
 class TestBlockToBlockType(unittest.TestCase):
     def test_block_to_block_type_paragraph(self):
         block = """
@@ -0,0 +1,79 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import treecache
+from htmlnode import HTMLNode, LeafNode, ParentNode, markdown_to_html_node
+from treecache import TreeCache, decode_node, encode_node
+
+MARKDOWN = """# Title
+
+Some **bold** and a [link](/blog) with ![img](/a.png)
+
+```
+code
+```
+
+1. one
+2. two
+"""
+
+class TestTreeCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = TreeCache(os.path.join(self.tmp.name, "trees"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_encode_decode_roundtrip(self):
+        node = markdown_to_html_node(MARKDOWN)
+        decoded = decode_node(encode_node(node))
+        self.assertEqual(decoded, node)
+        self.assertEqual(decoded.to_html(), node.to_html())
+
+    def test_roundtrip_keeps_node_classes(self):
+        node = ParentNode("div", [LeafNode("a", "x", {"href": "/"}), HTMLNode("p", "y", None, None)])
+        decoded = decode_node(encode_node(node))
+        self.assertIsInstance(decoded, ParentNode)
+        self.assertIsInstance(decoded.children[0], LeafNode)
+        self.assertEqual(type(decoded.children[1]), HTMLNode)
+        self.assertEqual(decoded.to_html(), node.to_html())
+
+    def test_second_parse_is_a_hit(self):
+        first = self.cache.parse(MARKDOWN)
+        with mock.patch.object(treecache, "markdown_to_html_node") as parse:
+            second = self.cache.parse(MARKDOWN)
+        parse.assert_not_called()
+        self.assertEqual(second, first)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_parser_version_changes_key(self):
+        key = self.cache.key(MARKDOWN)
+        with mock.patch.object(treecache, "PARSER_VERSION", "other"):
+            self.assertNotEqual(self.cache.key(MARKDOWN), key)
+
+    def test_corrupt_entry_is_reparsed(self):
+        self.cache.parse(MARKDOWN)
+        with open(self.cache.path(self.cache.key(MARKDOWN)), 'wb') as f:
+            f.write(b"garbage")
+        self.assertEqual(self.cache.get(MARKDOWN), None)
+        self.assertEqual(self.cache.parse(MARKDOWN), markdown_to_html_node(MARKDOWN))
+
+    def test_prune_evicts_least_recently_used(self):
+        documents = [f"# Page {i}\n\n" + "text " * 200 for i in range(3)]
+        for i, markdown in enumerate(documents):
+            self.cache.parse(markdown)
+            path = self.cache.path(self.cache.key(markdown))
+            os.utime(path, ns=(i, i))
+        size = os.path.getsize(self.cache.path(self.cache.key(documents[0])))
+
+        self.cache.get(documents[0])
+        self.cache.max_bytes = size * 2
+        self.assertEqual(self.cache.prune(), 1)
+        self.assertFalse(os.path.exists(self.cache.path(self.cache.key(documents[1]))))
+        self.assertTrue(os.path.exists(self.cache.path(self.cache.key(documents[0]))))
+
+if __name__ == "__main__":
+    unittest.main()
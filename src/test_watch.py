@@ -0,0 +1,147 @@
+import io
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+
+import watch
+from watch import Watcher, diff_stamps
+
+class TestWatcher(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = self.tmp.name
+        self.content = os.path.join(root, "content")
+        self.static = os.path.join(root, "static")
+        self.dest = os.path.join(root, "docs")
+        self.template = os.path.join(root, "template.html")
+        os.makedirs(os.path.join(self.content, "blog"))
+        os.makedirs(self.static)
+
+        self.write(self.template, '<title>{{ Title }}</title><link href="/index.css"><main>{{ Content }}</main>')
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nWelcome")
+        self.write(os.path.join(self.content, "blog", "post.md"), "# Post\n\nHello")
+        self.write(os.path.join(self.static, "index.css"), "body {}")
+
+        self.watcher = Watcher(self.content, self.static, self.template, self.dest, "/site/")
+        self.quietly(self.watcher.build)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, path, text, mtime_ns=None):
+        with open(path, 'w') as f:
+            f.write(text)
+        if mtime_ns is not None:
+            os.utime(path, ns=(mtime_ns, mtime_ns))
+
+    def read(self, path):
+        with open(path) as f:
+            return f.read()
+
+    def quietly(self, func, *args):
+        with redirect_stdout(io.StringIO()):
+            return func(*args)
+
+    def test_diff_stamps(self):
+        changed, removed = diff_stamps({"a": (1, 1), "b": (1, 1)}, {"a": (2, 1), "c": (1, 1)})
+        self.assertEqual(changed, ["a", "c"])
+        self.assertEqual(removed, ["b"])
+
+    def test_initial_build(self):
+        self.assertEqual(
+            self.read(os.path.join(self.dest, "index.html")),
+            '<title>Home</title><link href="/site/index.css"><main><div><h1>Home</h1><p>Welcome</p></div></main>'
+        )
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "index.css")))
+
+    def test_build_removes_outputs_of_sources_deleted_meanwhile(self):
+        os.remove(os.path.join(self.content, "blog", "post.md"))
+        watcher = Watcher(self.content, self.static, self.template, self.dest, "/site/")
+        log = io.StringIO()
+        with redirect_stdout(log):
+            watcher.build()
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "blog")))
+        self.assertIn(f"Removed orphaned output: {os.path.join(self.dest, 'blog', 'post.html')}", log.getvalue())
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "index.css")))
+
+    def test_no_change_rebuilds_nothing(self):
+        self.assertEqual(self.quietly(self.watcher.poll), [])
+
+    def test_content_change_rebuilds_only_that_page(self):
+        self.write(os.path.join(self.content, "blog", "post.md"), "# Post\n\nEdited", mtime_ns=1)
+        rebuilt = self.quietly(self.watcher.poll)
+        self.assertEqual(rebuilt, [os.path.join(self.dest, "blog", "post.html")])
+        self.assertIn("Edited", self.read(rebuilt[0]))
+
+    def test_template_change_does_not_reparse(self):
+        self.write(self.template, "<h1>{{ Title }}</h1>{{ Content }}", mtime_ns=1)
+        with mock.patch.object(watch, "render_page") as render_page:
+            rebuilt = self.quietly(self.watcher.poll)
+        render_page.assert_not_called()
+        self.assertEqual(len(rebuilt), 2)
+        self.assertTrue(self.read(os.path.join(self.dest, "index.html")).startswith("<h1>Home</h1><div>"))
+
+    def test_new_and_removed_sources(self):
+        self.write(os.path.join(self.content, "new.md"), "# New\n\nPage")
+        os.remove(os.path.join(self.content, "blog", "post.md"))
+        rebuilt = self.quietly(self.watcher.poll)
+
+        self.assertEqual(sorted(rebuilt), [
+            os.path.join(self.dest, "blog", "post.html"),
+            os.path.join(self.dest, "new.html"),
+        ])
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "blog")))
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "new.html")))
+
+    def test_asset_change_is_copied(self):
+        self.write(os.path.join(self.static, "index.css"), "body { margin: 0; }", mtime_ns=1)
+        rebuilt = self.quietly(self.watcher.poll)
+        self.assertEqual(rebuilt, [os.path.join(self.dest, "index.css")])
+        self.assertEqual(self.read(rebuilt[0]), "body { margin: 0; }")
+
+    def test_broken_page_keeps_previous_output(self):
+        self.write(os.path.join(self.content, "index.md"), "no heading", mtime_ns=1)
+        log = io.StringIO()
+        with redirect_stdout(log):
+            rebuilt = self.watcher.poll()
+        self.assertEqual(rebuilt, [])
+        self.assertIn("no heading detected", log.getvalue())
+        self.assertIn("Welcome", self.read(os.path.join(self.dest, "index.html")))
+
+    def test_unreadable_source_is_reported(self):
+        with open(os.path.join(self.content, ".index.md.swp"), 'wb') as f:
+            f.write(b"\xff\xfe\x00swap")
+        self.write(os.path.join(self.content, "blog", "post.md"), "# Post\n\nEdited", mtime_ns=1)
+        log = io.StringIO()
+        with redirect_stdout(log):
+            rebuilt = self.watcher.poll()
+        self.assertEqual(rebuilt, [os.path.join(self.dest, "blog", "post.html")])
+        self.assertIn(f"Error parsing Markdown file at {os.path.join(self.content, '.index.md.swp')}", log.getvalue())
+        self.assertEqual(self.quietly(self.watcher.poll), [])
+
+    def test_interrupted_update_is_retried(self):
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nEdited", mtime_ns=1)
+        self.write(os.path.join(self.static, "index.css"), "body { margin: 0; }", mtime_ns=1)
+        with mock.patch.object(self.watcher, "copy_asset", side_effect=RuntimeError("disk full")):
+            with self.assertRaises(RuntimeError):
+                self.quietly(self.watcher.poll)
+        self.assertIn("Edited", self.read(os.path.join(self.dest, "index.html")))
+
+        rebuilt = self.quietly(self.watcher.poll)
+        self.assertEqual(rebuilt, [os.path.join(self.dest, "index.css")])
+        self.assertEqual(self.read(rebuilt[0]), "body { margin: 0; }")
+
+    def test_run_survives_failed_polls(self):
+        with mock.patch.object(watch.time, "sleep"), \
+                mock.patch.object(self.watcher, "poll", side_effect=[OSError("gone"), [], KeyboardInterrupt]) as poll:
+            log = io.StringIO()
+            with redirect_stdout(log):
+                self.watcher.run()
+        self.assertEqual(poll.call_count, 3)
+        self.assertIn("Rebuild failed: gone", log.getvalue())
+        self.assertIn("Stopped watching", log.getvalue())
+
+if __name__ == "__main__":
+    unittest.main()
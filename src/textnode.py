@@ -1,4 +1,5 @@
 import re
+from collections import namedtuple
 from enum import Enum
 
 class TextType(Enum):
@@ -18,6 +19,8 @@ class BlockType(Enum):
     ordered_list = 'ordered_list'
 
 class TextNode:
+    __slots__ = ("text", "text_type", "url")
+
     def __init__(self, text, text_type, url=None): 
         self.text = text 
         self.text_type = text_type
@@ -137,56 +140,190 @@ def split_nodes_link(old_nodes):
 
     return new_nodes
 
-def text_to_textnodes(text):
-    textnodes = []
-    textnodes.append(TextNode(text, TextType.TEXT))
-
-    textnodes = split_nodes_delimiter(textnodes, "**", TextType.BOLD)
-    textnodes = split_nodes_delimiter(textnodes, "*", TextType.ITALIC)
-    textnodes = split_nodes_delimiter(textnodes, "_", TextType.ITALIC)
-    textnodes = split_nodes_delimiter(textnodes, "`", TextType.CODE) 
-    textnodes = split_nodes_image(textnodes)
-    textnodes = split_nodes_link(textnodes)
-
-    return textnodes
+DELIMITER_PATTERN = re.compile(r"\*\*|[*_`]")
+IMAGE_PATTERN = re.compile(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)")
+# No (?<!!) lookbehind here: spans are matched in place with pos/endpos, and
+# after the image pass no span can contain a "!" directly before a link anyway.
+LINK_PATTERN = re.compile(r"\[([^\[\]]*)\]\(([^\(\)]*)\)")
+
+# For each delimiter, the span types it can open or close in. "**" splits the
+# whole text, "*" only the parts outside bold, "_" only the parts outside bold
+# and *italic*, and "`" only plain text, exactly like the old split chain.
+DELIMITER_SCOPES = {
+    "**": (TextType.TEXT, TextType.ITALIC, "_", TextType.CODE, TextType.BOLD),
+    "*": (TextType.TEXT, "_", TextType.CODE, TextType.ITALIC),
+    "_": (TextType.TEXT, TextType.CODE, "_"),
+    "`": (TextType.TEXT, TextType.CODE),
+}
+
+DELIMITER_OPENS = {
+    "**": TextType.BOLD,
+    "*": TextType.ITALIC,
+    "_": "_",
+    "`": TextType.CODE,
+}
+
+def scan_delimiters(text):
+    # One left-to-right pass over the delimiter tokens. The state is the type
+    # of the currently open span; "_" stands for an italic span opened by an
+    # underscore, which closes differently from one opened by "*".
+    state = TextType.TEXT
+    start = 0
+
+    for match in DELIMITER_PATTERN.finditer(text):
+        delimiter = match.group()
+        if state not in DELIMITER_SCOPES[delimiter]:
+            continue
 
-def markdown_to_blocks(markdown):
-    raw_blocks = markdown.split("\n\n")
-    cleaned_blocks = []
+        yield state, start, match.start()
+        opened = DELIMITER_OPENS[delimiter]
+        state = TextType.TEXT if state == opened else opened
+        start = match.end()
+
+    yield state, start, len(text)
+
+def scan_pattern(pattern, text, start, end, node_type):
+    # Splits one span on the image or link pattern, dropping whitespace-only
+    # text before each match and keeping any text after the last one.
+    cursor = start
+    for match in pattern.finditer(text, start, end):
+        if not text[cursor:match.start()].isspace() and cursor < match.start():
+            yield TextType.TEXT, cursor, match.start(), None
+        yield node_type, match.start(1), match.end(1), match.group(2)
+        cursor = match.end()
+
+    if cursor == start:
+        yield None, start, end, None
+    elif cursor < end:
+        yield TextType.TEXT, cursor, end, None
+
+def tokenize_inline(text):
+    for text_type, start, end in scan_delimiters(text):
+        if text_type == "_":
+            text_type = TextType.ITALIC
+        elif text_type == TextType.TEXT and (start == end or text[start:end].isspace()):
+            continue
 
-    for block in raw_blocks:
-        stripped_block = block.replace("    ", "").strip()
+        for image_type, image_start, image_end, image_url in scan_pattern(IMAGE_PATTERN, text, start, end, TextType.IMAGE):
+            if image_type == TextType.IMAGE:
+                yield image_type, text[image_start:image_end], image_url
+                continue
 
-        if len(stripped_block) > 0:
-            cleaned_blocks.append(stripped_block)
+            if image_type is None:
+                image_type = text_type
 
-    return cleaned_blocks
-   
-def block_to_block_type(block):
-    lines = block.split("\n")
+            for link_type, link_start, link_end, link_url in scan_pattern(LINK_PATTERN, text, image_start, image_end, TextType.LINK):
+                if link_type is None:
+                    yield image_type, text[link_start:link_end], None
+                else:
+                    yield link_type, text[link_start:link_end], link_url
 
-    if re.match(r'^#{1,6} ', block):
+def text_to_textnodes(text):
+    return [TextNode(value, text_type, url) for text_type, value, url in tokenize_inline(text)]
+
+BlockSpan = namedtuple("BlockSpan", ["start", "end", "block_type"])
+
+HEADING_PATTERN = re.compile(r"#{1,6} ")
+NON_SPACE_PATTERN = re.compile(r"\S")
+# A closing fence is a line of ``` alone, with nothing but spaces or tabs after it.
+CLOSING_FENCE_PATTERN = re.compile(r"^```[ \t]*$", re.MULTILINE)
+CLOSING_FENCE_BYTES_PATTERN = re.compile(rb"^```[ \t]*$", re.MULTILINE)
+INDENT = "    "
+
+def iter_line_starts(text, start, end):
+    pos = start
+    while True:
+        yield pos
+        newline = text.find("\n", pos, end)
+        if newline == -1:
+            return
+        pos = newline + 1
+
+def classify_span(text, start, end):
+    if HEADING_PATTERN.match(text, start, end):
         return BlockType.heading
     
-    if re.match(r'^```', block) and re.search(r'```$', block):
+    if text.startswith("```", start, end) and (text.endswith("```", start, end) or
+                                               text.endswith("```\n", start, end)):
         return BlockType.code
     
-    if all(line.startswith('>') for line in lines):
+    if all(text.startswith(">", line, end) for line in iter_line_starts(text, start, end)):
         return BlockType.quote
     
-    if all(line.startswith('- ') for line in lines):
+    if all(text.startswith("- ", line, end) for line in iter_line_starts(text, start, end)):
         return BlockType.unordered_list
     
-    if lines[0].startswith("1. "):
-        is_ordered_list = True
-
-        for i in range(len(lines)):
-            expected_prefix = f"{i + 1}. "
-            if not lines[i].startswith(expected_prefix):
-                is_ordered_list = False
-                break
+    if all(text.startswith(f"{i}. ", line, end)
+           for i, line in enumerate(iter_line_starts(text, start, end), 1)):
+        return BlockType.ordered_list
         
-        if is_ordered_list:
-            return BlockType.ordered_list
-        
-    return BlockType.paragraph
\ No newline at end of file
+    return BlockType.paragraph
+
+def opens_fence(line):
+    # A fence alone or with an info string opens a block that runs to its
+    # closing fence; a line that also ends in one is a code block on its own.
+    # Works on str and on bytes, for stream.py.
+    fence = "```" if isinstance(line, str) else b"```"
+    line = line.rstrip()
+    return line == fence or not line.endswith(fence)
+
+def find_closing_fence(text, pos):
+    pattern = CLOSING_FENCE_PATTERN if isinstance(text, str) else CLOSING_FENCE_BYTES_PATTERN
+    return pattern.search(text, pos)
+
+def block_text(markdown, span):
+    # Blocks are dedented by dropping every four-space run. Most blocks have
+    # none, and then the span is the block text as it stands.
+    if markdown.find(INDENT, span.start, span.end) == -1:
+        return markdown[span.start:span.end]
+    return markdown[span.start:span.end].replace(INDENT, "").strip()
+
+def scan_blocks(markdown):
+    length = len(markdown)
+    pos = 0
+    # Set once a search for a closing fence fails: none can exist past there.
+    no_fence_from = length + 1
+
+    while pos < length:
+        separator = markdown.find("\n\n", pos)
+        if separator == -1:
+            separator = length
+
+        first = NON_SPACE_PATTERN.search(markdown, pos, separator)
+        if first is None:
+            pos = separator + 2
+            continue
+        start = first.start()
+
+        # A fenced code block runs to its closing fence even across blank lines.
+        first_line_end = markdown.find("\n", start, separator)
+        if first_line_end == -1:
+            first_line_end = separator
+        if markdown.startswith("```", start, separator) and first_line_end < no_fence_from:
+            if opens_fence(markdown[start:first_line_end]):
+                closing = find_closing_fence(markdown, first_line_end)
+                if closing is None:
+                    no_fence_from = first_line_end
+                elif closing.start() > separator:
+                    separator = markdown.find("\n\n", closing.end())
+                    if separator == -1:
+                        separator = length
+
+        end = separator
+        while markdown[end - 1].isspace():
+            end -= 1
+
+        if markdown.find(INDENT, start, end) == -1:
+            block_type = classify_span(markdown, start, end)
+        else:
+            block = markdown[start:end].replace(INDENT, "").strip()
+            block_type = classify_span(block, 0, len(block))
+
+        yield BlockSpan(start, end, block_type)
+        pos = separator + 2
+
+def markdown_to_blocks(markdown):
+    return [block_text(markdown, span) for span in scan_blocks(markdown)]
+
+def block_to_block_type(block):
+    return classify_span(block, 0, len(block))
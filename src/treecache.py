@@ -0,0 +1,112 @@
+import hashlib
+import marshal
+import os
+import sys
+from htmlnode import HTMLNode, LeafNode, ParentNode, PARSER_VERSION, markdown_to_html_node
+
+TREE_CACHE_DIR = os.path.join(".build-cache", "trees")
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+HTML_NODE = 0
+LEAF_NODE = 1
+PARENT_NODE = 2
+
+def encode_node(node):
+    if isinstance(node, LeafNode):
+        return (LEAF_NODE, node.tag, node.value, node.props, None)
+
+    kind = PARENT_NODE if isinstance(node, ParentNode) else HTML_NODE
+    children = None
+    if node.children is not None:
+        children = [encode_node(child) for child in node.children]
+    return (kind, node.tag, node.value, node.props, children)
+
+def decode_node(data):
+    kind, tag, value, props, children = data
+    if props:
+        props = {sys.intern(key): prop for key, prop in props.items()}
+
+    if kind == LEAF_NODE:
+        return LeafNode(tag, value, props)
+
+    if children is not None:
+        children = [decode_node(child) for child in children]
+
+    if kind == PARENT_NODE:
+        return ParentNode(tag, children, props)
+
+    return HTMLNode(tag, value, children, props)
+
+class TreeCache:
+    def __init__(self, cache_dir=TREE_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, markdown):
+        digest = hashlib.sha256(f"{PARSER_VERSION}:{marshal.version}:".encode())
+        digest.update(markdown.encode())
+        return digest.hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.cache_dir, key[:2], key + ".bin")
+
+    def get(self, markdown):
+        path = self.path(self.key(markdown))
+        try:
+            with open(path, 'rb') as f:
+                node = decode_node(marshal.load(f))
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+
+        # The mtime doubles as the last-used time for LRU eviction.
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return node
+
+    def put(self, markdown, node):
+        path = self.path(self.key(markdown))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            marshal.dump(encode_node(node), f)
+        os.replace(tmp_path, path)
+
+    def parse(self, markdown):
+        node = self.get(markdown)
+        if node is not None:
+            self.hits += 1
+            return node
+
+        self.misses += 1
+        node = markdown_to_html_node(markdown)
+        self.put(markdown, node)
+        return node
+
+    def prune(self):
+        entries = []
+        total = 0
+        for dir_path, dirs, files in os.walk(self.cache_dir):
+            for name in files:
+                path = os.path.join(dir_path, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime_ns, stat.st_size, path))
+                total += stat.st_size
+
+        removed = 0
+        for mtime, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        return removed
@@ -0,0 +1,179 @@
+import os
+import time
+from fileindex import scan_files
+from manifest import remove_empty_dirs
+from page import render_page, report_page, write_page
+from sync import copy_file, files_match, remove_orphans
+from template import load_template
+
+def scan_tree(dir_path):
+    try:
+        files, dirs = scan_files(dir_path, [], [])
+    except FileNotFoundError:
+        return {}
+    return {entry.path: (entry.mtime_ns, entry.size) for entry in files}
+
+def diff_stamps(old, new):
+    changed = sorted(path for path, stamp in new.items() if old.get(path) != stamp)
+    removed = sorted(path for path in old if path not in new)
+    return changed, removed
+
+class Watcher:
+    def __init__(self, content_dir, static_dir, template_path, dest_dir, base_path="/"):
+        self.content_dir = content_dir
+        self.static_dir = static_dir
+        self.template_path = template_path
+        self.dest_dir = dest_dir
+        self.base_path = base_path
+
+        self.template = None
+        self.stamps = {}
+        # Dependency graph: every watched source maps to the output it produces.
+        # Every page also depends on the template.
+        self.outputs = {}
+        # Rendered slot values per page, so a template change only re-templates.
+        self.rendered = {}
+
+    def page_dest(self, source_path):
+        rel_path = os.path.relpath(source_path, self.content_dir)
+        return os.path.join(self.dest_dir, os.path.splitext(rel_path)[0] + ".html")
+
+    def asset_dest(self, source_path):
+        return os.path.join(self.dest_dir, os.path.relpath(source_path, self.static_dir))
+
+    def scan(self):
+        stamps = {}
+        stamps.update(scan_tree(self.content_dir))
+        stamps.update(scan_tree(self.static_dir))
+        try:
+            stat = os.stat(self.template_path)
+            stamps[self.template_path] = (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            pass
+        return stamps
+
+    def is_page(self, path):
+        return os.path.commonpath([path, self.content_dir]) == self.content_dir
+
+    def render(self, source_path):
+        dest_path = self.page_dest(source_path)
+        # A source can be deleted between the scan and the read, or be an
+        # editor's binary swap file; either is reported like a broken page.
+        try:
+            with open(source_path, 'r') as f:
+                markdown = f.read()
+            values = render_page(markdown, self.template)
+        except Exception as e:
+            self.rendered.pop(source_path, None)
+            report_page(source_path, self.template_path, dest_path, str(e))
+            return None
+
+        report_page(source_path, self.template_path, dest_path, None)
+        self.rendered[source_path] = values
+        self.outputs[source_path] = dest_path
+        write_page(dest_path, self.template, values)
+        return dest_path
+
+    def retemplate(self):
+        rebuilt = []
+        for source_path in sorted(self.rendered):
+            dest_path = self.outputs[source_path]
+            write_page(dest_path, self.template, self.rendered[source_path])
+            rebuilt.append(dest_path)
+        print(f"Template changed, re-templated {len(rebuilt)} pages")
+        return rebuilt
+
+    def copy_asset(self, source_path):
+        dest_path = self.asset_dest(source_path)
+        self.outputs[source_path] = dest_path
+        if files_match(source_path, dest_path):
+            return None
+
+        os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+        copy_file(source_path, dest_path)
+        print(f"Copied file: {source_path} to {dest_path}")
+        return dest_path
+
+    def remove(self, source_path):
+        self.rendered.pop(source_path, None)
+        dest_path = self.outputs.pop(source_path, None)
+        if dest_path is None or not os.path.isfile(dest_path):
+            return None
+
+        os.remove(dest_path)
+        remove_empty_dirs(os.path.dirname(dest_path))
+        print(f"Removed stale output: {dest_path}")
+        return dest_path
+
+    def update(self, changed, removed, stamps):
+        # A source's stamp only moves to the scanned one once it has been
+        # handled, so anything an error interrupts is picked up by the next poll.
+        rebuilt = []
+
+        for source_path in removed:
+            dest_path = self.remove(source_path)
+            self.stamps.pop(source_path, None)
+            if dest_path is not None:
+                rebuilt.append(dest_path)
+
+        if self.template_path in changed:
+            self.template = load_template(self.template_path, self.base_path)
+            rebuilt.extend(self.retemplate())
+            self.stamps[self.template_path] = stamps[self.template_path]
+
+        for source_path in changed:
+            if source_path == self.template_path:
+                continue
+
+            if self.is_page(source_path):
+                dest_path = self.render(source_path)
+            else:
+                try:
+                    dest_path = self.copy_asset(source_path)
+                except OSError as e:
+                    print(f"Error copying file {source_path}: {e}")
+                    dest_path = None
+            self.stamps[source_path] = stamps[source_path]
+
+            if dest_path is not None:
+                rebuilt.append(dest_path)
+
+        return rebuilt
+
+    def build(self):
+        self.template = load_template(self.template_path, self.base_path)
+        stamps = self.scan()
+        self.stamps = {}
+        if self.template_path in stamps:
+            self.stamps[self.template_path] = stamps[self.template_path]
+        changed = [path for path in stamps if path != self.template_path]
+        rebuilt = self.update(changed, [], stamps)
+        # Sources deleted while nothing was watching left their outputs behind.
+        remove_orphans(self.dest_dir, self.outputs.values())
+        return rebuilt
+
+    def poll(self):
+        stamps = self.scan()
+        changed, removed = diff_stamps(self.stamps, stamps)
+        if not changed and not removed:
+            return []
+
+        start = time.perf_counter()
+        rebuilt = self.update(changed, removed, stamps)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"Rebuilt {len(rebuilt)} outputs in {elapsed:.1f} ms")
+        return rebuilt
+
+    def run(self, interval=0.5):
+        self.build()
+        print(f"Watching {self.content_dir}, {self.static_dir} and {self.template_path} for changes")
+
+        try:
+            while True:
+                time.sleep(interval)
+                try:
+                    self.poll()
+                except Exception as e:
+                    print(f"Rebuild failed: {e}")
+        except KeyboardInterrupt:
+            print("Stopped watching")